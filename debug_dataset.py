@@ -1,5 +1,6 @@
 """Debug script to check dataset structure."""
 
+import pandas as pd
 from datasets import load_dataset
 
 # Load a small sample from the first subset
@@ -11,19 +12,17 @@ dataset = load_dataset(
     streaming=True,
 )
 
-# Check first few rows
+# Collect the first few rows into one frame and print them in a single call
+df = pd.DataFrame(list(dataset.take(10)))
+print(f"\nKeys: {list(df.columns)}")
+
+if "content" in df:
+    df["content_size"] = df["content"].str.len().fillna(0).astype(int)
+
+summary_columns = [
+    col
+    for col in ("file_type", "path", "content_available", "extension", "content_size")
+    if col in df
+]
 print("\nFirst 10 rows:")
-for i, row in enumerate(dataset.take(10)):
-    print(f"\nRow {i}:")
-    print(f"  Keys: {row.keys()}")
-    if "file_type" in row:
-        print(f"  file_type: {row['file_type']}")
-    if "path" in row:
-        print(f"  path: {row['path']}")
-    if "content_available" in row:
-        print(f"  content_available: {row['content_available']}")
-    if "extension" in row:
-        print(f"  extension: {row['extension']}")
-    if "content" in row:
-        content_size = len(row["content"]) if row["content"] else 0
-        print(f"  content size: {content_size} bytes")
+print(df[summary_columns].to_string())
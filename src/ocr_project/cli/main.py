@@ -1,16 +1,71 @@
 """CLI entry point for OCR processing."""
 
+import os
+import queue
 import sys
+import threading
+from collections.abc import Iterable, Iterator
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
 
 import click
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from PIL import Image
+    from rich.progress import Progress, TaskID
+
+    from ocr_project.models.deepseek_ocr import DeepSeekOCR
+
+# Maximum number of page images / results buffered between pipeline stages
+_PIPELINE_QUEUE_SIZE = 32
+
+# Seconds to wait for a micro-batch of pages to fill before dispatching it
+_BATCH_MAX_WAIT = 0.1
+
+# Finished pages accumulated before each progress bar update
+_PROGRESS_STEP = 16
+
+# Input file extensions picked up by the batch command (lowercase, no leading dot)
+_SUPPORTED_EXTENSIONS = frozenset({"png", "jpg", "jpeg", "bmp", "tiff", "webp", "pdf"})
+
 
 @click.group()
 @click.version_option(version="0.1.0")
-def cli() -> None:
+@click.pass_context
+def cli(ctx: click.Context) -> None:
     """OCR processing using DeepSeek-OCR and vLLM."""
-    pass
+    ctx.ensure_object(dict)
+
+
+def _get_model(ctx: click.Context, resolution: str, max_connections: int) -> "DeepSeekOCR":
+    """Return a DeepSeek-OCR model, reusing one already attached to the context.
+
+    Models are memoized in ``ctx.obj`` by resolution and pool size, so
+    library callers that invoke several commands with a shared ``obj``
+    (e.g. ``cli.main(args, obj=shared, standalone_mode=False)``) skip the
+    repeated health check and connection pool setup.
+
+    Args:
+        ctx: Click context whose ``obj`` dict holds the model cache
+        resolution: Resolution mode for processing
+        max_connections: Connection pool size for concurrent requests
+
+    Returns:
+        Initialized DeepSeek-OCR model
+
+    Raises:
+        RuntimeError: If vLLM server is not running
+    """
+    from ocr_project.models.deepseek_ocr import DeepSeekOCR
+
+    models = ctx.ensure_object(dict).setdefault("models", {})
+    key = (resolution, max_connections)
+    if key not in models:
+        models[key] = DeepSeekOCR(resolution=resolution, max_connections=max_connections)
+    return models[key]
 
 
 @cli.command()
@@ -28,24 +83,37 @@ def cli() -> None:
     default="base",
     help="Resolution mode for processing",
 )
-def process(input_path: Path, output: Path | None, resolution: str) -> None:
+@click.option(
+    "--concurrency",
+    "-c",
+    type=int,
+    default=8,
+    help="Number of OCR requests in flight at once",
+)
+@click.pass_context
+def process(
+    ctx: click.Context, input_path: Path, output: Path | None, resolution: str, concurrency: int
+) -> None:
     """Process a single image or PDF file and extract text as markdown.
 
     For images: Creates one markdown file
     For PDFs: Creates one markdown file per page
 
     Args:
+        ctx: Click context (holds the shared model cache)
         input_path: Path to the image or PDF file
         output: Optional output file/directory path
         resolution: Resolution mode for processing
+        concurrency: Number of PDF pages sent to the server at once
     """
-    from ocr_project.models.deepseek_ocr import DeepSeekOCR
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
     from ocr_project.utils.file_io import save_markdown
-    from ocr_project.utils.pdf import is_pdf, pdf_to_images
+    from ocr_project.utils.pdf import get_pdf_page_count, is_pdf, pdf_to_images_iter
 
     # Initialize model
     try:
-        model = DeepSeekOCR(resolution=resolution)
+        model = _get_model(ctx, resolution, 2 * concurrency)
     except RuntimeError as e:
         click.echo(f"Error: {e}", err=True)
         click.echo("\nMake sure to start the server first in another terminal:", err=True)
@@ -56,34 +124,44 @@ def process(input_path: Path, output: Path | None, resolution: str) -> None:
         if is_pdf(input_path):
             # Convert PDF to images
             click.echo(f"Converting PDF: {input_path}")
-            pages = pdf_to_images(input_path)
-            click.echo(f"Found {len(pages)} page(s)")
-
-            # Process each page
-            for page_num, image in pages:
-                click.echo(f"Processing page {page_num}...")
-                result = model.client.process_image(image, resolution)
-
-                # Determine output path
-                if output:
-                    # If output is a directory, use it; otherwise use as base path
-                    if output.is_dir() or not output.suffix:
-                        out_dir = output
-                        out_dir.mkdir(parents=True, exist_ok=True)
-                        out_path = out_dir / f"{input_path.stem}_page{page_num:03d}.md"
+            page_count = get_pdf_page_count(input_path)
+            click.echo(f"Found {page_count} page(s)")
+
+            # Send pages concurrently so the server can batch them; pages are
+            # rasterized lazily and at most `concurrency` wait on the server
+            inflight = threading.BoundedSemaphore(concurrency)
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = {}
+                for page_num, image in pdf_to_images_iter(input_path):
+                    inflight.acquire()
+                    future = executor.submit(model.client.process_image, image, resolution)
+                    future.add_done_callback(partial(_release_page, image=image, slots=inflight))
+                    futures[future] = page_num
+
+                for future in as_completed(futures):
+                    page_num = futures[future]
+                    result = future.result()
+
+                    # Determine output path
+                    if output:
+                        # If output is a directory, use it; otherwise use as base path
+                        if output.is_dir() or not output.suffix:
+                            out_dir = output
+                            out_dir.mkdir(parents=True, exist_ok=True)
+                            out_path = out_dir / f"{input_path.stem}_page{page_num:03d}.md"
+                        else:
+                            # Output specified as file - add page number before extension
+                            out_path = (
+                                output.parent / f"{output.stem}_page{page_num:03d}{output.suffix}"
+                            )
                     else:
-                        # Output specified as file - add page number before extension
-                        out_path = (
-                            output.parent / f"{output.stem}_page{page_num:03d}{output.suffix}"
-                        )
-                else:
-                    # Save in same directory as input
-                    out_path = input_path.parent / f"{input_path.stem}_page{page_num:03d}.md"
+                        # Save in same directory as input
+                        out_path = input_path.parent / f"{input_path.stem}_page{page_num:03d}.md"
 
-                save_markdown(result, out_path)
-                click.echo(f"  Saved: {out_path}")
+                    save_markdown(result, out_path)
+                    click.echo(f"  Saved page {page_num}: {out_path}")
 
-            click.echo(f"\nProcessed {len(pages)} page(s) successfully")
+            click.echo(f"\nProcessed {page_count} page(s) successfully")
 
         else:
             # Process single image
@@ -123,115 +201,453 @@ def process(input_path: Path, output: Path | None, resolution: str) -> None:
     "--batch-size",
     "-b",
     type=int,
-    default=4,
-    help="(Not currently used - processing is sequential)",
+    default=8,
+    help="Maximum pages grouped by size into one dispatch micro-batch",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=int,
+    default=8,
+    help="Number of OCR requests in flight at once",
 )
-def batch(input_dir: Path, output: Path, resolution: str, batch_size: int) -> None:
+@click.option(
+    "--max-inflight",
+    type=int,
+    default=None,
+    help="Maximum pages queued for OCR at once (default: 4 x concurrency)",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=2,
+    help="Number of threads loading images and rasterizing PDFs",
+)
+@click.option(
+    "--single-file",
+    is_flag=True,
+    help="Write each PDF as one .md file with '# Page N' headings instead of one file per page",
+)
+@click.pass_context
+def batch(
+    ctx: click.Context,
+    input_dir: Path,
+    output: Path,
+    resolution: str,
+    batch_size: int,
+    concurrency: int,
+    max_inflight: int | None,
+    workers: int,
+    single_file: bool,
+) -> None:
     """Batch process images and PDFs from a directory.
 
     Recursively scans input_dir, processes all images and PDFs,
     and mirrors directory structure in output directory.
 
     Args:
+        ctx: Click context (holds the shared model cache)
         input_dir: Directory containing images and/or PDFs to process
         output: Output directory for markdown files
         resolution: Resolution mode for processing
-        batch_size: Batch size (currently not used - sequential processing)
+        batch_size: Maximum pages per size-bucketed micro-batch
+        concurrency: Number of OCR requests in flight at once
+        max_inflight: Maximum pages submitted but not yet finished
+        workers: Number of threads loading images and rasterizing PDFs
+        single_file: Combine all pages of each PDF into one markdown file
     """
     from rich.progress import Progress
 
-    from ocr_project.models.deepseek_ocr import DeepSeekOCR
-    from ocr_project.utils.file_io import save_markdown
-    from ocr_project.utils.pdf import is_pdf, pdf_to_images
-
     # Initialize model
     try:
-        model = DeepSeekOCR(resolution=resolution)
+        model = _get_model(ctx, resolution, 2 * concurrency)
     except RuntimeError as e:
         click.echo(f"Error: {e}", err=True)
         click.echo("\nMake sure to start the server first in another terminal:", err=True)
         click.echo("  uv run ocr server", err=True)
         return
 
-    # Collect all files to process
-    supported_extensions = {".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp", ".pdf"}
-    all_files = []
-
     click.echo(f"Scanning {input_dir}...")
-    for file in input_dir.rglob("*"):
-        if file.is_file() and file.suffix.lower() in supported_extensions:
-            all_files.append(file)
-
-    if not all_files:
+    all_files = _iter_inputs(input_dir, _SUPPORTED_EXTENSIONS)
+
+    # Process with a per-page progress bar; the total grows as the scan discovers files
+    with Progress(refresh_per_second=4) as progress:
+        task = progress.add_task("[cyan]Processing pages...", total=None)
+        file_count, processed_count, total_pages, error_count = _run_pipeline(
+            model,
+            all_files,
+            input_dir,
+            output,
+            resolution,
+            batch_size,
+            concurrency,
+            max_inflight or 4 * concurrency,
+            progress,
+            task,
+            single_file=single_file,
+            workers=workers,
+        )
+
+    if file_count == 0:
         click.echo("No images or PDFs found in directory")
         return
 
-    click.echo(f"Found {len(all_files)} file(s) to process\n")
-
-    # Track errors and statistics
-    errors = []
-    processed_count = 0
-    total_pages = 0
-
-    # Process with progress bar
-    with Progress() as progress:
-        task = progress.add_task("[cyan]Processing files...", total=len(all_files))
+    # Report results
+    click.echo(f"\nScanned {file_count} file(s)")
+    click.echo(f"✓ Successfully processed {processed_count} file(s)")
+    if total_pages > 0:
+        click.echo(f"  ({total_pages} PDF page(s) total)")
 
-        for file_path in all_files:
-            try:
-                # Determine relative path for mirroring structure
-                rel_path = file_path.relative_to(input_dir)
+    if error_count:
+        click.echo(f"\n✗ {error_count} file(s) failed")
+        click.echo(f"\nError details saved to: {output / 'errors.txt'}")
+    else:
+        click.echo("\nAll files processed successfully!")
 
-                if is_pdf(file_path):
-                    # Process PDF pages
-                    pages = pdf_to_images(file_path)
 
-                    for page_num, image in pages:
-                        result = model.client.process_image(image, resolution)
+def _release_page(
+    _future: "Future", image: "Image.Image", slots: threading.BoundedSemaphore
+) -> None:
+    """Done callback for a submitted page: free its bitmap and in-flight slot."""
+    image.close()
+    slots.release()
 
-                        # Mirror directory structure
-                        out_dir = output / rel_path.parent
-                        out_dir.mkdir(parents=True, exist_ok=True)
-                        out_path = out_dir / f"{file_path.stem}_page{page_num:03d}.md"
 
-                        save_markdown(result, out_path)
-                        processed_count += 1
-                        total_pages += 1
-                else:
-                    # Process single image
-                    result = model.process_image(file_path)
+def _iter_inputs(root: Path, exts: frozenset[str]) -> Iterator[Path]:
+    """Recursively yield files under root whose extension is in exts.
 
-                    # Mirror directory structure
-                    out_dir = output / rel_path.parent
-                    out_dir.mkdir(parents=True, exist_ok=True)
-                    out_path = out_dir / f"{file_path.stem}.md"
+    Uses an explicit-stack ``os.scandir`` walk: directory entries carry their
+    file type, so no extra stat is needed per entry, and ``Path`` objects are
+    only built for matching files. Directories that cannot be read are
+    skipped.
 
-                    save_markdown(result, out_path)
-                    processed_count += 1
+    Args:
+        root: Directory to scan
+        exts: Lowercase extensions without the leading dot (e.g. "png")
 
-            except Exception as e:
-                errors.append((file_path, str(e)))
+    Yields:
+        Paths of matching files
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1][1:].lower() in exts and entry.is_file():
+                    yield Path(entry.path)
+
+
+def _run_pipeline(
+    model: "DeepSeekOCR",
+    all_files: Iterable[Path],
+    input_dir: Path,
+    output: Path,
+    resolution: str,
+    batch_size: int,
+    concurrency: int,
+    max_inflight: int,
+    progress: "Progress",
+    task: "TaskID",
+    single_file: bool = False,
+    workers: int = 1,
+) -> tuple[int, int, int, int]:
+    """Run batch OCR as a three-stage pipeline connected by bounded queues.
+
+    A scanner thread consumes ``all_files`` (which may be a lazy directory
+    walk) and grows the progress total as files are found. Stage A loads
+    images and rasterizes PDFs on ``workers`` threads, stage B collects
+    pages into micro-batches of up to ``batch_size``, groups them by image
+    size and sends them to the vLLM server with up to ``concurrency``
+    requests in flight, and stage C
+    writes markdown, so PDF rendering and disk writes overlap with GPU
+    inference and the server can batch concurrent requests. Output
+    directories are created once each rather than on every write. At most
+    ``max_inflight`` pages are submitted but unfinished at any time, which
+    keeps the server's waiting queue (and client memory) bounded.
 
-            progress.update(task, advance=1)
+    Args:
+        model: Initialized DeepSeek-OCR model
+        all_files: Image and PDF files to process (may be a lazy iterator)
+        input_dir: Root input directory (used to mirror directory structure)
+        output: Output directory for markdown files
+        resolution: Resolution mode for processing
+        batch_size: Maximum pages per size-bucketed micro-batch
+        concurrency: Number of OCR requests in flight at once
+        max_inflight: Maximum pages submitted but not yet finished
+        progress: Rich progress display, advanced as pages finish
+        task: Progress task to advance
+        single_file: Buffer the pages of each PDF and write them as one
+            markdown file with "# Page N" headings once the PDF is finished
+        workers: Number of threads loading images and rasterizing PDFs
 
-    # Report results
-    click.echo(f"\n✓ Successfully processed {processed_count} file(s)")
-    if total_pages > 0:
-        click.echo(f"  ({total_pages} PDF page(s) total)")
+    Returns:
+        (file_count, processed_count, total_pages, error_count). Failures are
+        appended to ``output / "errors.txt"`` as they happen, one
+        "file_path: error" line per failed file.
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
-    if errors:
-        click.echo(f"\n✗ {len(errors)} file(s) failed:")
-        error_report_path = output / "errors.txt"
+    from ocr_project.models.vllm_client import RESOLUTION_SIZES
+    from ocr_project.utils.batching import group_by_size, iter_batches
+    from ocr_project.utils.file_io import save_markdown
+    from ocr_project.utils.image import load_image
+    from ocr_project.utils.pdf import get_pdf_page_count, is_pdf, pdf_to_images_iter
+
+    # Items: (file_path, page_count), page_count is None for images; unbounded
+    # since entries are small and the scan should run ahead
+    q_files: queue.Queue[tuple[Path, int | None] | None] = queue.Queue()
+    # Items: (file_path, page_num, page_count, out_path, image), page_num is None for images
+    q_images: queue.Queue[tuple | None] = queue.Queue(maxsize=_PIPELINE_QUEUE_SIZE)
+    # Items: (file_path, page_num, page_count, out_path, result, error)
+    q_writes: queue.Queue[tuple | None] = queue.Queue(maxsize=_PIPELINE_QUEUE_SIZE)
+    # Set when a stage fails, so the stages feeding it stop early
+    stop = threading.Event()
+    # Set once the rasterizers have queued their last page
+    rasterized = threading.Event()
+
+    file_count = 0
+
+    def scan() -> None:
+        """Enumerate input files and grow the page total as they are found.
+
+        Images are queued as soon as they are found, so OCR starts while the
+        scan is still running. PDFs are held back until the scan finishes
+        and their page counts are read once from metadata, so the rasterizers
+        never have to re-check file types.
+        """
+        nonlocal file_count
+        total = 0
+        pdfs: list[Path] = []
+        try:
+            for file_path in all_files:
+                if stop.is_set():
+                    return
+                file_count += 1
+                if is_pdf(file_path):
+                    pdfs.append(file_path)
+                    continue
+                total += 1
+                progress.update(task, total=total)
+                q_files.put((file_path, None))
+
+            for file_path in pdfs:
+                if stop.is_set():
+                    return
+                try:
+                    page_count = get_pdf_page_count(file_path)
+                except Exception as e:
+                    total += 1
+                    q_writes.put((file_path, None, 1, None, None, str(e)))
+                else:
+                    total += page_count
+                    q_files.put((file_path, page_count))
+                progress.update(task, total=total)
+        finally:
+            q_files.put(None)
+
+    def rasterize_files() -> None:
+        """Load images and rasterize PDFs until the file queue is exhausted."""
+        while (entry := q_files.get()) is not None:
+            if stop.is_set():
+                continue
+            file_path, page_count = entry
+            # Mirror directory structure
+            out_dir = output / file_path.relative_to(input_dir).parent
+            if page_count is None:
+                try:
+                    image = load_image(file_path, max_size=RESOLUTION_SIZES.get(resolution))
+                except Exception as e:
+                    q_writes.put((file_path, None, 1, None, None, str(e)))
+                else:
+                    out_path = out_dir / f"{file_path.stem}.md"
+                    q_images.put((file_path, None, 1, out_path, image))
+                continue
 
-        with open(error_report_path, "w") as f:
-            for file_path, error in errors:
-                error_line = f"{file_path}: {error}"
-                click.echo(f"  - {error_line}")
-                f.write(error_line + "\n")
+            pages_sent = 0
+            error = f"rendered fewer pages than the {page_count} in its metadata"
+            try:
+                for page_num, image in pdf_to_images_iter(file_path, page_count=page_count):
+                    if stop.is_set():
+                        image.close()
+                        break
+                    if single_file:
+                        out_path = out_dir / f"{file_path.stem}.md"
+                    else:
+                        out_path = out_dir / f"{file_path.stem}_page{page_num:03d}.md"
+                    q_images.put((file_path, page_num, page_count, out_path, image))
+                    pages_sent += 1
+            except Exception as e:
+                error = str(e)
+            if stop.is_set():
+                continue
+            # Fail the pages that were never sent (the renderer raised or
+            # stopped short) so the file still completes
+            for _ in range(page_count - pages_sent):
+                q_writes.put((file_path, None, page_count, None, None, error))
+        # Pass the sentinel on so the other rasterizer threads stop too
+        q_files.put(None)
+
+    def rasterize() -> None:
+        """Stage A: rasterize files on ``workers`` threads into page images."""
+        try:
+            # pdf2image renders in a poppler subprocess, so threads run in parallel
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                rasterizers = [executor.submit(rasterize_files) for _ in range(workers)]
+            for rasterizer in rasterizers:
+                rasterizer.result()
+        except Exception:
+            stop.set()
+            raise
+        finally:
+            q_images.put(None)
+            rasterized.set()
+
+    def infer() -> None:
+        """Stage B: send size-bucketed page micro-batches to the vLLM server."""
+        # Backpressure: block submission until an in-flight request finishes
+        inflight = threading.BoundedSemaphore(max_inflight)
+
+        def on_done(future: "Future", item: tuple) -> None:
+            file_path, page_num, page_count, out_path, _ = item
+            try:
+                q_writes.put((file_path, page_num, page_count, out_path, future.result(), None))
+            except Exception as e:
+                q_writes.put((file_path, page_num, page_count, None, None, str(e)))
+            finally:
+                # Free the page bitmap as soon as it has been sent
+                item[4].close()
+                inflight.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for pages in iter_batches(q_images, batch_size, _BATCH_MAX_WAIT):
+                    if stop.is_set():
+                        # Writing failed: discard pages until the rasterizers stop
+                        for item in pages:
+                            item[4].close()
+                        continue
+                    # Similar-sized pages reach the server together and share a batch
+                    for group in group_by_size(pages, lambda item: item[4].size):
+                        for item in group:
+                            inflight.acquire()
+                            future = executor.submit(
+                                model.client.process_image, item[4], resolution
+                            )
+                            future.add_done_callback(partial(on_done, item=item))
+        except Exception:
+            # Stop the scan and rasterizers, and drain pages until they are
+            # done so none stays blocked on a full queue. The sentinel may
+            # already have been consumed, so wait on the event instead
+            stop.set()
+            while not rasterized.is_set() or not q_images.empty():
+                try:
+                    item = q_images.get(timeout=_BATCH_MAX_WAIT)
+                except queue.Empty:
+                    continue
+                if item is not None:
+                    item[4].close()
+            raise
+        finally:
+            q_writes.put(None)
 
-        click.echo(f"\nError details saved to: {error_report_path}")
-    else:
-        click.echo("\nAll files processed successfully!")
+    processed_count = 0
+    total_pages = 0
+    error_count = 0
+
+    def write() -> None:
+        """Stage C: write markdown and advance progress once per finished page."""
+        nonlocal processed_count, total_pages, error_count
+        pages_left: dict[Path, int] = {}
+        # Unfinished files that already failed; cleared as each file completes
+        failed: set[Path] = set()
+        # Opened on the first failure; line-buffered so errors survive a crash
+        error_log: TextIO | None = None
+        pending_advance = 0
+        # Output directories already created, so each is only mkdir'd once
+        created_dirs: set[Path] = set()
+        # Buffered (page_num, out_path, markdown) per PDF when writing single files
+        buffered: dict[Path, list[tuple[int, Path, str]]] = {}
+
+        def fail(file_path: Path, error: str) -> None:
+            nonlocal error_count, error_log
+            # Report each failed file once, even if several of its pages failed
+            if file_path in failed:
+                return
+            failed.add(file_path)
+            error_count += 1
+            if error_log is None:
+                output.mkdir(parents=True, exist_ok=True)
+                error_log = open(output / "errors.txt", "w", buffering=1)
+            error_log.write(f"{file_path}: {error}\n")
+            progress.console.print(f"  ✗ {file_path}: {error}", markup=False)
+
+        def save(content: str, out_path: Path) -> None:
+            if out_path.parent not in created_dirs:
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(out_path.parent)
+            save_markdown(content, out_path, create_parents=False)
+
+        try:
+            while (item := q_writes.get()) is not None:
+                file_path, page_num, page_count, out_path, result, error = item
+                if error is None and single_file and page_num is not None:
+                    buffered.setdefault(file_path, []).append((page_num, out_path, result))
+                    processed_count += 1
+                    total_pages += 1
+                elif error is None:
+                    try:
+                        save(result, out_path)
+                        processed_count += 1
+                        if page_num is not None:
+                            total_pages += 1
+                    except Exception as e:
+                        error = str(e)
+
+                if error is not None:
+                    fail(file_path, error)
+
+                # Advance in steps to avoid a locked progress update per page
+                pending_advance += 1
+                if pending_advance >= _PROGRESS_STEP:
+                    progress.update(task, advance=pending_advance)
+                    pending_advance = 0
+                left = pages_left.pop(file_path, page_count) - 1
+                if left > 0:
+                    pages_left[file_path] = left
+                    continue
+
+                if pages := buffered.pop(file_path, None):
+                    pages.sort()
+                    content = "\n\n".join(f"# Page {num}\n\n{text}" for num, _, text in pages)
+                    try:
+                        save(content, pages[0][1])
+                    except Exception as e:
+                        fail(file_path, str(e))
+                failed.discard(file_path)
+        except Exception:
+            # Stop the upstream stages and drain results until inference
+            # finishes, so no page callback stays blocked on a full queue
+            stop.set()
+            while q_writes.get() is not None:
+                pass
+            raise
+        finally:
+            progress.update(task, advance=pending_advance)
+            if error_log is not None:
+                error_log.close()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        stages = [executor.submit(stage) for stage in (scan, rasterize, infer, write)]
+    for stage in stages:
+        stage.result()
+
+    return file_count, processed_count, total_pages, error_count
 
 
 @cli.command()
@@ -255,7 +671,16 @@ def batch(input_dir: Path, output: Path, resolution: str, batch_size: int) -> No
     default=False,
     help="Overwrite existing output files (default: skip existing)",
 )
-def dataset(config_path: Path, server_url: str, resolution: str, overwrite: bool) -> None:
+@click.option(
+    "--batch-size",
+    "-b",
+    type=int,
+    default=None,
+    help="Maximum images grouped by size into one dispatch micro-batch (default: from config)",
+)
+def dataset(
+    config_path: Path, server_url: str, resolution: str, overwrite: bool, batch_size: int | None
+) -> None:
     """Process HuggingFace datasets using a YAML configuration file.
 
     The config file should specify dataset name, subsets, splits,
@@ -265,6 +690,8 @@ def dataset(config_path: Path, server_url: str, resolution: str, overwrite: bool
         config_path: Path to YAML configuration file
         server_url: URL of vLLM server
         resolution: Resolution mode for processing
+        overwrite: Overwrite existing output files
+        batch_size: Maximum images per micro-batch, overriding the config
     """
     from ocr_project.dataset.config import DatasetConfig
     from ocr_project.dataset.processor import DatasetProcessor
@@ -275,6 +702,8 @@ def dataset(config_path: Path, server_url: str, resolution: str, overwrite: bool
         # Override overwrite setting from CLI flag
         if overwrite:
             config.overwrite = True
+        if batch_size is not None:
+            config.batch_size = batch_size
     except Exception as e:
         click.echo(f"Error loading configuration: {e}", err=True)
         return
@@ -285,6 +714,7 @@ def dataset(config_path: Path, server_url: str, resolution: str, overwrite: bool
     if config.max_samples:
         click.echo(f"Max samples per subset: {config.max_samples}")
     click.echo(f"Overwrite existing files: {config.overwrite}")
+    click.echo(f"Batch size: {config.batch_size}")
     click.echo()
 
     # Initialize processor
@@ -316,6 +746,46 @@ def dataset(config_path: Path, server_url: str, resolution: str, overwrite: bool
         return
 
 
+@cli.command()
+@click.argument("config_path", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--shard-size",
+    type=int,
+    default=128,
+    help="Target shard size in MB (uncompressed)",
+)
+def preshard(config_path: Path, shard_size: int) -> None:
+    """Pre-split dataset subsets into local parquet shards.
+
+    Streams every configured subset split into ~shard_size MB parquet
+    files under <output_dir>/_shards. The dataset command then reads those
+    shards instead of the source dataset. Splits that are already
+    presharded are skipped.
+
+    Args:
+        config_path: Path to YAML configuration file
+        shard_size: Target shard size in MB
+    """
+    from ocr_project.dataset.config import DatasetConfig
+    from ocr_project.dataset.preshard import preshard_split
+
+    try:
+        config = DatasetConfig.from_yaml(config_path)
+    except Exception as e:
+        click.echo(f"Error loading configuration: {e}", err=True)
+        return
+
+    click.echo(f"Presharding dataset: {config.name}")
+    for subset_config in config.subsets:
+        for split in subset_config.splits:
+            try:
+                shards = preshard_split(config, subset_config, split, shard_size * 1024 * 1024)
+            except Exception as e:
+                click.echo(f"✗ {subset_config.name}/{split}: {e}", err=True)
+                continue
+            click.echo(f"✓ {subset_config.name}/{split}: {len(shards)} shard(s)")
+
+
 @cli.command()
 @click.argument("output_dir", type=click.Path(exists=True, path_type=Path))
 @click.option(
@@ -1,7 +1,26 @@
 """HuggingFace dataset processing utilities."""
 
-from ocr_project.dataset.config import DatasetConfig, SubsetConfig
-from ocr_project.dataset.export import DatasetExporter
-from ocr_project.dataset.processor import DatasetProcessor
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ocr_project.dataset.config import DatasetConfig, SubsetConfig
+    from ocr_project.dataset.export import DatasetExporter
+    from ocr_project.dataset.processor import DatasetProcessor
 
 __all__ = ["DatasetConfig", "SubsetConfig", "DatasetProcessor", "DatasetExporter"]
+
+# Public names and the submodules that define them; imported on first access
+# (PEP 562) so importing the package doesn't load datasets, pyarrow or rich
+_EXPORTS = {
+    "DatasetConfig": "ocr_project.dataset.config",
+    "SubsetConfig": "ocr_project.dataset.config",
+    "DatasetProcessor": "ocr_project.dataset.processor",
+    "DatasetExporter": "ocr_project.dataset.export",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if module := _EXPORTS.get(name):
+        return getattr(importlib.import_module(module), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
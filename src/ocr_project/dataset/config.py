@@ -1,12 +1,58 @@
 """Configuration schema for HuggingFace dataset processing."""
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
 from pathlib import Path
+from typing import Any, get_args, get_origin
 
 import yaml
 
+# Prefer the libyaml C loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as _Dumper
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    from yaml import SafeDumper as _Dumper
+    from yaml import SafeLoader as _Loader
 
-@dataclass
+# Directory under a dataset's output directory that holds presharded splits
+SHARDS_DIR_NAME = "_shards"
+
+# Default images grouped by size per dispatch micro-batch
+DEFAULT_BATCH_SIZE = 16
+
+
+def _from_dict[T](cls: type[T], data: dict[str, Any]) -> T:
+    """Build a dataclass from a dict by walking its fields.
+
+    Missing keys fall back to the field defaults; nested dataclasses (and
+    lists of them) are built recursively and ``Path`` fields are converted
+    from strings.
+
+    Args:
+        cls: Dataclass type to build
+        data: Mapping of field names to values
+
+    Returns:
+        Instance of cls
+    """
+    kwargs = {f.name: _convert(f.type, data[f.name]) for f in fields(cls) if f.name in data}
+    return cls(**kwargs)
+
+
+def _convert(tp: Any, value: Any) -> Any:
+    """Convert a plain YAML/dict value to the declared field type."""
+    if value is None:
+        return None
+    if is_dataclass(tp):
+        return _from_dict(tp, value)
+    if get_origin(tp) is list and (args := get_args(tp)) and is_dataclass(args[0]):
+        return [_from_dict(args[0], v) for v in value]
+    if tp is Path:
+        return Path(value)
+    return value
+
+
+@dataclass(slots=True)
 class SubsetConfig:
     """Configuration for a dataset subset/config."""
 
@@ -20,7 +66,7 @@ class SubsetConfig:
     content_available_column: str | None = None  # Column indicating if content is available
 
 
-@dataclass
+@dataclass(slots=True)
 class DatasetConfig:
     """Configuration for processing a HuggingFace dataset."""
 
@@ -30,6 +76,30 @@ class DatasetConfig:
     streaming: bool = True
     max_samples: int | None = None
     overwrite: bool = False  # Whether to overwrite existing output files
+    batch_size: int = DEFAULT_BATCH_SIZE  # Images grouped by size per dispatch micro-batch
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "DatasetConfig":
+        """Build configuration from a plain dict (e.g. parsed YAML).
+
+        Args:
+            data: Configuration mapping
+
+        Returns:
+            DatasetConfig instance
+        """
+        return _from_dict(cls, data)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert configuration to a plain, YAML-serializable dict.
+
+        Returns:
+            Configuration mapping, with subsets last for readability
+        """
+        data = asdict(self)
+        data["output_dir"] = str(self.output_dir)
+        data["subsets"] = data.pop("subsets")
+        return data
 
     @classmethod
     def from_yaml(cls, path: Path) -> "DatasetConfig":
@@ -42,30 +112,9 @@ class DatasetConfig:
             DatasetConfig instance
         """
         with open(path) as f:
-            data = yaml.safe_load(f)
-
-        subsets = [
-            SubsetConfig(
-                name=s["name"],
-                splits=s["splits"],
-                content_columns=s["content_columns"],
-                image_columns=s.get("image_columns", []),
-                filter_column=s.get("filter_column"),
-                filter_values=s.get("filter_values"),
-                extension_column=s.get("extension_column"),
-                content_available_column=s.get("content_available_column"),
-            )
-            for s in data["subsets"]
-        ]
-
-        return cls(
-            name=data["name"],
-            subsets=subsets,
-            output_dir=Path(data["output_dir"]),
-            streaming=data.get("streaming", True),
-            max_samples=data.get("max_samples"),
-            overwrite=data.get("overwrite", False),
-        )
+            data = yaml.load(f, Loader=_Loader)
+
+        return cls.from_dict(data)
 
     def to_yaml(self, path: Path) -> None:
         """Save configuration to YAML file.
@@ -73,27 +122,6 @@ class DatasetConfig:
         Args:
             path: Path to save YAML configuration file
         """
-        data = {
-            "name": self.name,
-            "output_dir": str(self.output_dir),
-            "streaming": self.streaming,
-            "max_samples": self.max_samples,
-            "overwrite": self.overwrite,
-            "subsets": [
-                {
-                    "name": s.name,
-                    "splits": s.splits,
-                    "content_columns": s.content_columns,
-                    "image_columns": s.image_columns,
-                    "filter_column": s.filter_column,
-                    "filter_values": s.filter_values,
-                    "extension_column": s.extension_column,
-                    "content_available_column": s.content_available_column,
-                }
-                for s in self.subsets
-            ],
-        }
-
         path.parent.mkdir(parents=True, exist_ok=True)
         with open(path, "w") as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(self.to_dict(), f, Dumper=_Dumper, default_flow_style=False, sort_keys=False)
@@ -1,13 +1,150 @@
 """Export OCR results to HuggingFace dataset format."""
 
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
-import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 from rich.progress import Progress
 
+from ocr_project.dataset.config import SHARDS_DIR_NAME
+
+# Parquet schema of exported records
+_SCHEMA = pa.schema(
+    [
+        ("source_file", pa.string()),
+        ("page_number", pa.int32()),
+        ("split", pa.string()),
+        ("text", pa.string()),
+        ("ocr_model", pa.string()),
+        ("resolution", pa.string()),
+        ("char_count", pa.int32()),
+        ("word_count", pa.int32()),
+        ("line_count", pa.int32()),
+        ("is_empty", pa.bool_()),
+    ]
+)
+
+# Records converted to Arrow and written per batch (and per row group)
+_WRITE_BATCH_SIZE = 8192
+
+# Low-cardinality string columns stored with dictionary encoding
+_DICTIONARY_COLUMNS = ["source_file", "split", "ocr_model", "resolution"]
+
+# Threads reading markdown files, and files read per window of reads
+_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_READ_WINDOW = 256
+
+
+def _open_writer(path: Path) -> pq.ParquetWriter:
+    """Open a parquet writer for exported records with tuned encoding."""
+    return pq.ParquetWriter(
+        path,
+        _SCHEMA,
+        compression="snappy",
+        use_dictionary=_DICTIONARY_COLUMNS,
+        write_batch_size=_WRITE_BATCH_SIZE,
+    )
+
+
+def _read_texts(paths: Iterable[Path]) -> Iterator[tuple[Path, str]]:
+    """Read text files on a thread pool, keeping many reads in flight.
+
+    Paths are read in windows of ``_READ_WINDOW`` so the walk stays lazy
+    and at most one window of file contents is held at a time.
+
+    Args:
+        paths: Files to read (may be a lazy iterator)
+
+    Yields:
+        (path, text) tuples in input order
+    """
+    paths = iter(paths)
+    with ThreadPoolExecutor(max_workers=_READ_WORKERS) as executor:
+        while window := list(islice(paths, _READ_WINDOW)):
+            texts = executor.map(partial(Path.read_text, encoding="utf-8"), window)
+            yield from zip(window, texts, strict=True)
+
+
+class _ShardWriter:
+    """Stream one split's records into parquet shards of bounded size.
+
+    Shards roll over once the Arrow bytes written to the current shard
+    reach ``max_bytes``. Shards are written under temporary names and
+    renamed on close to ``<prefix>.parquet`` for a single shard, or
+    ``<prefix>-00000-of-0000N.parquet`` when the split was sharded.
+    """
+
+    def __init__(self, output_dir: Path, prefix: str, max_bytes: int):
+        """Initialize shard writer.
+
+        Args:
+            output_dir: Directory to write shards into
+            prefix: Shard file name prefix (e.g. "subset-train")
+            max_bytes: Approximate maximum uncompressed bytes per shard
+        """
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.count = 0
+        self._pending: list[dict[str, Any]] = []
+        self._paths: list[Path] = []
+        self._writer: pq.ParquetWriter | None = None
+        self._shard_bytes = 0
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Buffer a record, writing a batch once enough are pending."""
+        self._pending.append(record)
+        if len(self._pending) >= _WRITE_BATCH_SIZE:
+            self._flush()
+
+    def close(self) -> list[Path]:
+        """Write remaining records and give the shards their final names.
+
+        Returns:
+            Paths of the written shards, in order
+        """
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+        if len(self._paths) == 1:
+            names = [f"{self.prefix}.parquet"]
+        else:
+            total = len(self._paths)
+            names = [f"{self.prefix}-{i:05d}-of-{total:05d}.parquet" for i in range(total)]
+        return [
+            path.replace(self.output_dir / name)
+            for path, name in zip(self._paths, names, strict=True)
+        ]
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        batch = pa.RecordBatch.from_pylist(self._pending, schema=_SCHEMA)
+        self.count += len(self._pending)
+        self._pending.clear()
+
+        if self._writer is None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"{self.prefix}-{len(self._paths):05d}.parquet.tmp"
+            self._paths.append(path)
+            self._writer = _open_writer(path)
+        self._writer.write_batch(batch, row_group_size=_WRITE_BATCH_SIZE)
+        self._shard_bytes += batch.nbytes
+
+        # Start a new shard once this one is full
+        if self._shard_bytes >= self.max_bytes:
+            self._writer.close()
+            self._writer = None
+            self._shard_bytes = 0
+
 
 class DatasetExporter:
     """Export OCR markdown files to HuggingFace dataset format."""
@@ -35,19 +172,27 @@ class DatasetExporter:
     def collect_files(self, subset_dir: Path) -> list[dict[str, Any]]:
         """Collect all markdown files from a subset directory.
 
+        This holds every record in memory; prefer iter_files for large
+        subsets.
+
         Args:
             subset_dir: Directory containing markdown files for a subset
 
         Returns:
             List of file records with metadata
         """
-        records = []
+        return list(self.iter_files(subset_dir))
+
+    def iter_files(self, subset_dir: Path) -> Iterator[dict[str, Any]]:
+        """Lazily read markdown files from a subset directory.
 
-        for md_file in subset_dir.rglob("*.md"):
-            # Read markdown content
-            with open(md_file, encoding="utf-8") as f:
-                text = f.read()
+        Args:
+            subset_dir: Directory containing markdown files for a subset
 
+        Yields:
+            File records with metadata, one per markdown file
+        """
+        for md_file, text in _read_texts(subset_dir.rglob("*.md")):
             # Extract metadata from path
             relative_path = md_file.relative_to(subset_dir)
             parts = relative_path.parts
@@ -58,16 +203,11 @@ class DatasetExporter:
             # Get filename without extension
             filename = md_file.stem
 
-            # Check if it's a multi-page document
+            # Check if it's a multi-page document ("doc_page001"), in one scan
             page_num = None
-            if "_page" in filename:
-                # Extract page number from filename like "doc_page001"
-                base_name = filename.rsplit("_page", 1)[0]
-                page_str = filename.rsplit("_page", 1)[1]
-                try:
-                    page_num = int(page_str)
-                except ValueError:
-                    base_name = filename
+            base_name, sep, page_str = filename.rpartition("_page")
+            if sep and page_str.isdecimal():
+                page_num = int(page_str)
             else:
                 base_name = filename
 
@@ -79,7 +219,7 @@ class DatasetExporter:
             non_whitespace = len(text.strip())
             is_empty = non_whitespace < 10  # Less than 10 chars is basically empty
 
-            record = {
+            yield {
                 "source_file": base_name,
                 "page_number": page_num,
                 "split": split,
@@ -92,42 +232,31 @@ class DatasetExporter:
                 "is_empty": is_empty,
             }
 
-            records.append(record)
-
-        return records
-
-    def create_parquet(self, records: list[dict[str, Any]], output_path: Path) -> None:
+    def create_parquet(self, records: Iterable[dict[str, Any]], output_path: Path) -> int:
         """Create parquet file from records.
 
+        Records are converted to Arrow and written in batches, so memory use
+        is bounded by the batch size rather than the number of records.
+
         Args:
-            records: List of file records
+            records: File records (may be a lazy iterator)
             output_path: Path to save parquet file
+
+        Returns:
+            Number of records written
         """
-        # Convert to pandas DataFrame
-        df = pd.DataFrame(records)
-
-        # Define schema with proper types
-        schema = pa.schema(
-            [
-                ("source_file", pa.string()),
-                ("page_number", pa.int32()),
-                ("split", pa.string()),
-                ("text", pa.string()),
-                ("ocr_model", pa.string()),
-                ("resolution", pa.string()),
-                ("char_count", pa.int32()),
-                ("word_count", pa.int32()),
-                ("line_count", pa.int32()),
-                ("is_empty", pa.bool_()),
-            ]
-        )
-
-        # Convert to PyArrow Table
-        table = pa.Table.from_pandas(df, schema=schema)
-
-        # Write parquet file
+        # Stream record batches into the parquet file
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        pq.write_table(table, output_path, compression="snappy")
+        count = 0
+        records = iter(records)
+        with _open_writer(output_path) as writer:
+            while batch := list(islice(records, _WRITE_BATCH_SIZE)):
+                writer.write_batch(
+                    pa.RecordBatch.from_pylist(batch, schema=_SCHEMA),
+                    row_group_size=_WRITE_BATCH_SIZE,
+                )
+                count += len(batch)
+        return count
 
     def export_subset(self, subset_name: str, split: str | None = None) -> Path:
         """Export a single subset to parquet.
@@ -143,15 +272,10 @@ class DatasetExporter:
         if not subset_dir.exists():
             raise ValueError(f"Subset directory not found: {subset_dir}")
 
-        # Collect all files
-        records = self.collect_files(subset_dir)
-
-        # Filter by split if specified
+        # Stream files, filtered by split if specified
+        records = self.iter_files(subset_dir)
         if split:
-            records = [r for r in records if r["split"] == split]
-
-        if not records:
-            raise ValueError(f"No records found for subset {subset_name}")
+            records = (r for r in records if r["split"] == split)
 
         # Create output filename
         if split:
@@ -162,7 +286,9 @@ class DatasetExporter:
         output_path = self.output_dir / "dataset" / output_filename
 
         # Create parquet file
-        self.create_parquet(records, output_path)
+        if self.create_parquet(records, output_path) == 0:
+            output_path.unlink()
+            raise ValueError(f"No records found for subset {subset_name}")
 
         return output_path
 
@@ -178,7 +304,11 @@ class DatasetExporter:
         results = {}
 
         # Find all subset directories
-        subset_dirs = [d for d in self.output_dir.iterdir() if d.is_dir() and d.name != "dataset"]
+        subset_dirs = [
+            d
+            for d in self.output_dir.iterdir()
+            if d.is_dir() and d.name not in ("dataset", SHARDS_DIR_NAME)
+        ]
 
         with Progress() as progress:
             task = progress.add_task("[cyan]Exporting datasets...", total=len(subset_dirs))
@@ -187,64 +317,35 @@ class DatasetExporter:
                 subset_name = subset_dir.name
                 progress.console.print(f"\n[bold]Processing subset: {subset_name}")
 
-                # Collect all files
-                records = self.collect_files(subset_dir)
+                # Stream records into per-split shard writers
+                writers: dict[str, _ShardWriter] = {}
+                for record in self.iter_files(subset_dir):
+                    split = record["split"]
+                    if split not in writers:
+                        writers[split] = _ShardWriter(
+                            self.output_dir / "dataset",
+                            f"{subset_name}-{split}",
+                            max_shard_size_mb * 1024 * 1024,
+                        )
+                    writers[split].write(record)
 
-                if not records:
+                if not writers:
                     progress.console.print(f"[yellow]No files found in {subset_name}")
                     progress.update(task, advance=1)
                     continue
 
-                # Group by split
-                splits = {}
-                for record in records:
-                    split = record["split"]
-                    if split not in splits:
-                        splits[split] = []
-                    splits[split].append(record)
-
                 subset_files = []
-
-                # Export each split
-                for split, split_records in splits.items():
-                    # Check if we need to shard
-                    df = pd.DataFrame(split_records)
-                    size_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
-
-                    if size_mb > max_shard_size_mb:
-                        # Calculate number of shards needed
-                        num_shards = int(size_mb / max_shard_size_mb) + 1
-                        shard_size = len(split_records) // num_shards
-
-                        progress.console.print(
-                            f"  Sharding {split} into {num_shards} files ({size_mb:.1f}MB total)"
-                        )
-
-                        # Create shards
-                        for i in range(num_shards):
-                            start_idx = i * shard_size
-                            end_idx = (
-                                start_idx + shard_size if i < num_shards - 1 else len(split_records)
-                            )
-                            shard_records = split_records[start_idx:end_idx]
-
-                            output_path = (
-                                self.output_dir
-                                / "dataset"
-                                / f"{subset_name}-{split}-{i:05d}-of-{num_shards:05d}.parquet"
-                            )
-                            self.create_parquet(shard_records, output_path)
-                            subset_files.append(output_path)
-
-                    else:
-                        # Single file for this split
-                        output_path = self.output_dir / "dataset" / f"{subset_name}-{split}.parquet"
-                        self.create_parquet(split_records, output_path)
-                        subset_files.append(output_path)
+                record_count = 0
+                for split, writer in writers.items():
+                    paths = writer.close()
+                    if len(paths) > 1:
+                        progress.console.print(f"  Sharded {split} into {len(paths)} files")
+                    subset_files.extend(paths)
+                    record_count += writer.count
 
                 results[subset_name] = subset_files
                 progress.console.print(
-                    f"[green]✓ {subset_name}: {len(records)} records -> {len(subset_files)} file(s)"
+                    f"[green]✓ {subset_name}: {record_count} records -> {len(subset_files)} file(s)"
                 )
 
                 progress.update(task, advance=1)
@@ -276,14 +377,13 @@ class DatasetExporter:
         subset_stats = {}
 
         for subset_dir in self.output_dir.iterdir():
-            if subset_dir.is_dir() and subset_dir.name != "dataset":
-                records = self.collect_files(subset_dir)
-                subset_stats[subset_dir.name] = {
-                    "files": len(list(subset_dir.rglob("*.md"))),
-                    "records": len(records),
-                }
-                total_files += subset_stats[subset_dir.name]["files"]
-                total_records += len(records)
+            if subset_dir.is_dir() and subset_dir.name not in ("dataset", SHARDS_DIR_NAME):
+                # Each markdown file is one record, so one walk gives both
+                # counts without reading any file contents
+                file_count = self._count_files(subset_dir)
+                subset_stats[subset_dir.name] = {"files": file_count, "records": file_count}
+                total_files += file_count
+                total_records += file_count
 
         # Get list of parquet files and organize by config
         dataset_dir = self.output_dir / "dataset"
@@ -437,6 +537,10 @@ MIT License
 
         return card
 
+    def _count_files(self, subset_dir: Path) -> int:
+        """Count markdown files under a subset directory without reading them."""
+        return sum(1 for _ in subset_dir.rglob("*.md"))
+
     def _get_size_category(self, num_records: int) -> str:
         """Get HuggingFace size category based on number of records."""
         if num_records < 1000:
@@ -0,0 +1,106 @@
+"""Pre-split dataset subsets into fixed-size local parquet shards."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pyarrow.parquet as pq
+from datasets import load_dataset
+
+from ocr_project.dataset.config import SHARDS_DIR_NAME, DatasetConfig, SubsetConfig
+
+# Target uncompressed Arrow bytes per shard
+DEFAULT_SHARD_BYTES = 128 * 1024 * 1024
+
+# Rows read from the source dataset per Arrow batch
+_READ_BATCH_ROWS = 256
+
+
+def shard_dir(config: DatasetConfig, subset_name: str, split: str) -> Path:
+    """Get the directory holding the shards of one subset split.
+
+    Args:
+        config: Dataset configuration
+        subset_name: Name of the subset
+        split: Split name
+
+    Returns:
+        Path to the shard directory (which may not exist)
+    """
+    return config.output_dir / SHARDS_DIR_NAME / subset_name / split
+
+
+def find_shards(config: DatasetConfig, subset_name: str, split: str) -> list[Path]:
+    """List the presharded parquet files of one subset split.
+
+    Args:
+        config: Dataset configuration
+        subset_name: Name of the subset
+        split: Split name
+
+    Returns:
+        Sorted shard paths, or an empty list if the split is not presharded
+    """
+    directory = shard_dir(config, subset_name, split)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob("*.parquet"))
+
+
+def preshard_split(
+    config: DatasetConfig,
+    subset_config: SubsetConfig,
+    split: str,
+    target_bytes: int = DEFAULT_SHARD_BYTES,
+) -> list[Path]:
+    """Stream one subset split into parquet shards of roughly target_bytes.
+
+    Rows are streamed from the source dataset as Arrow batches, without
+    decoding images, and appended to the current shard until it reaches
+    ``target_bytes`` of uncompressed Arrow data. Shards are written to a
+    temporary directory that is renamed into place when complete, so an
+    interrupted run never leaves a partial shard set behind. Splits that
+    are already presharded are left untouched.
+
+    Args:
+        config: Dataset configuration
+        subset_config: Subset to preshard
+        split: Split name
+        target_bytes: Target uncompressed size per shard
+
+    Returns:
+        Sorted list of shard paths
+    """
+    if existing := find_shards(config, subset_config.name, split):
+        return existing
+
+    final_dir = shard_dir(config, subset_config.name, split)
+    tmp_dir = final_dir.with_name(f"{final_dir.name}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    dataset = load_dataset(config.name, name=subset_config.name, split=split, streaming=True)
+
+    writer = None
+    shard_index = 0
+    shard_bytes = 0
+    try:
+        for table in dataset.with_format("arrow").iter(batch_size=_READ_BATCH_ROWS):
+            if writer is None:
+                shard_path = tmp_dir / f"shard-{shard_index:05d}.parquet"
+                writer = pq.ParquetWriter(shard_path, table.schema)
+            writer.write_table(table)
+            shard_bytes += table.nbytes
+
+            # Roll over to a new shard once this one is full
+            if shard_bytes >= target_bytes:
+                writer.close()
+                writer = None
+                shard_index += 1
+                shard_bytes = 0
+    finally:
+        if writer is not None:
+            writer.close()
+
+    os.replace(tmp_dir, final_dir)
+    return find_shards(config, subset_config.name, split)
@@ -1,19 +1,74 @@
 """HuggingFace dataset processor for OCR."""
 
+import asyncio
 import io
-import tempfile
-from collections.abc import Generator
+import os
+import queue
+import threading
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import pyarrow as pa
+import pyarrow.dataset as ds
 from datasets import load_dataset
 from PIL import Image
+from rich.markup import escape
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ocr_project.dataset.config import DatasetConfig, SubsetConfig
-from ocr_project.models.vllm_client import VLLMClient
+from ocr_project.dataset.preshard import find_shards
+from ocr_project.models.vllm_client import RESOLUTION_SIZES, VLLMClient
+from ocr_project.utils.batching import group_by_size, iter_batches
 from ocr_project.utils.file_io import save_markdown
-from ocr_project.utils.pdf import pdf_to_images
+from ocr_project.utils.image import draft_image
+from ocr_project.utils.pdf import pdf_bytes_to_images_iter
+
+# Seconds to wait for a partial OCR batch to fill before sending it
+_BATCH_MAX_WAIT = 0.1
+
+# Leading bytes of the PDF and common image formats (PNG, JPEG, GIF, WebP's
+# RIFF container, BMP and little/big-endian TIFF)
+_PDF_MAGIC = b"%PDF"
+_IMAGE_MAGICS = (
+    b"\x89PNG\r\n\x1a\n",
+    b"\xff\xd8\xff",
+    b"GIF87a",
+    b"GIF89a",
+    b"RIFF",
+    b"BM",
+    b"II*\x00",
+    b"MM\x00*",
+)
+
+# Path separators replaced in row ids to form output file names
+_SAFE_ID_TABLE = str.maketrans({"/": "_", "\\": "_"})
+
+# Subsets processed at once by process_all
+_MAX_CONCURRENT_SUBSETS = 4
+
+# Items finished between progress updates
+_PROGRESS_STEP = 16
+
+# Maximum items buffered between pipeline stages
+_PIPELINE_QUEUE_SIZE = 32
+
+# OCR requests kept open across all subsets being processed, matching the
+# server's default --max-num-seqs so its scheduler always has work queued
+_MAX_IN_FLIGHT = 64
+
+# Pre-buffer shard reads on PyArrow's I/O threads, fetching the next
+# row group while the current one is being processed
+_PARQUET_SCAN_OPTIONS = ds.ParquetFragmentScanOptions(
+    pre_buffer=True,
+    cache_options=pa.CacheOptions(prefetch_limit=1, range_size_limit=128 << 20),
+)
+
+# Threads extracting images from rows, shared by all subsets being
+# processed; pdf2image renders in a poppler subprocess, so PDFs rasterize
+# in parallel
+_DECODE_WORKERS = os.cpu_count() or 1
 
 
 class DatasetProcessor:
@@ -24,6 +79,7 @@ class DatasetProcessor:
         config: DatasetConfig,
         server_url: str = "http://127.0.0.1:8000/v1",
         resolution: str = "base",
+        batch_size: int | None = None,
     ):
         """Initialize dataset processor.
 
@@ -31,10 +87,16 @@ class DatasetProcessor:
             config: Dataset configuration
             server_url: URL of vLLM server
             resolution: OCR resolution mode
+            batch_size: Maximum images per micro-batch grouped by size before
+                dispatch; a batch is dispatched when it is full or has waited
+                0.1s for more images (default: the configured batch_size)
         """
         self.config = config
         self.client = VLLMClient(base_url=server_url)
         self.resolution = resolution
+        self.batch_size = config.batch_size if batch_size is None else batch_size
+        # Output directories already created, so each is only mkdir'd once
+        self._created_dirs: set[Path] = set()
 
         # Check server health
         if not self.client.health_check():
@@ -42,90 +104,91 @@ class DatasetProcessor:
 
     def _extract_content_from_bytes(
         self, content_bytes: bytes, file_extension: str | None = None
-    ) -> list[tuple[int, Image.Image]]:
+    ) -> Iterator[tuple[int, Image.Image]]:
         """Extract images from bytes column.
 
+        PDF pages are rasterized a few at a time as the iterator advances,
+        so a long document is never held in memory all at once.
+
         Args:
             content_bytes: Raw file bytes
             file_extension: File extension to determine type
 
-        Returns:
-            List of (page_number, Image) tuples. For images, returns [(1, image)].
-            For PDFs, returns [(page_num, image), ...] for each page.
+        Yields:
+            (page_number, Image) tuples. For images, yields (1, image) once.
+            For PDFs, yields (page_num, image) for each page. Nothing is
+            yielded if the content can't be read.
         """
-        # Try to open as image directly
-        try:
-            img = Image.open(io.BytesIO(content_bytes))
-            return [(1, img)]
-        except Exception:
-            pass
-
-        # If extension suggests PDF, try to convert
-        if file_extension and file_extension.lower() == ".pdf":
+        # Sniff the content type from its leading bytes; PDFs are recognized
+        # even without an extension and never go through a failed PIL parse
+        is_pdf = content_bytes.startswith(_PDF_MAGIC)
+        is_image = not is_pdf and content_bytes.startswith(_IMAGE_MAGICS)
+        if not is_pdf and not is_image:
+            # Unknown signature: fall back to letting PIL and the extension decide
+            is_image = True
+            is_pdf = bool(file_extension) and file_extension.lower() == ".pdf"
+
+        if is_image:
+            # Decode here rather than lazily when the image is encoded for upload.
+            # Pages are downsampled to the resolution mode's size before upload,
+            # so JPEGs are decoded at the smallest DCT scale that still covers it
             try:
-                # Write bytes to temporary file for pdf2image
-                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-                    tmp.write(content_bytes)
-                    tmp_path = Path(tmp.name)
-
-                try:
-                    # Convert PDF to images
-                    pages = pdf_to_images(tmp_path)
-                    return pages
-                finally:
-                    # Clean up temp file
-                    tmp_path.unlink(missing_ok=True)
-
+                img = Image.open(io.BytesIO(content_bytes))
+                if max_size := RESOLUTION_SIZES.get(self.resolution):
+                    draft_image(img, max_size)
+                img.load()
             except Exception:
                 pass
+            else:
+                yield (1, img)
+                return
 
-        # Unable to extract
-        return []
+        if is_pdf:
+            try:
+                yield from pdf_bytes_to_images_iter(content_bytes)
+            except ValueError:
+                # Unable to extract (further pages)
+                pass
 
     def _process_row(
         self, row: dict[str, Any], subset_config: SubsetConfig
-    ) -> list[tuple[str, int, Image.Image]]:
+    ) -> Iterator[tuple[str, int, Image.Image]]:
         """Extract images from a dataset row.
 
         Args:
             row: Dataset row
             subset_config: Subset configuration
 
-        Returns:
-            List of (column_name, page_number, image) tuples
+        Yields:
+            (column_name, page_number, image) tuples, as they are decoded
         """
-        images = []
-
         # Check if content is available (if column specified)
         if subset_config.content_available_column:
             if not row.get(subset_config.content_available_column, True):
                 # Content not available, skip this row
-                return images
+                return
 
         # Process image columns
         for col in subset_config.image_columns:
-            if col in row and row[col] is not None:
-                if isinstance(row[col], Image.Image):
-                    images.append((col, 1, row[col]))
+            image = row.get(col)
+            if isinstance(image, Image.Image):
+                yield (col, 1, image)
+
+        # Get file extension from configured column or fallback to 'extension';
+        # it is the same for every content column of the row
+        extension_column = subset_config.extension_column
+        if extension_column and extension_column in row:
+            file_ext = row[extension_column]
+        else:
+            file_ext = row.get("extension")
 
         # Process content columns (bytes)
         for col in subset_config.content_columns:
-            if col in row and row[col] is not None:
-                # Check if it's bytes
-                if isinstance(row[col], bytes):
-                    # Get file extension from configured column or fallback to 'extension'
-                    file_ext = None
-                    if subset_config.extension_column and subset_config.extension_column in row:
-                        file_ext = row[subset_config.extension_column]
-                    elif "extension" in row:
-                        file_ext = row["extension"]
-
-                    pages = self._extract_content_from_bytes(row[col], file_ext)
-                    # Add all pages from the content
-                    for page_num, img in pages:
-                        images.append((col, page_num, img))
-
-        return images
+            content = row.get(col)
+            if isinstance(content, bytes):
+                # Stream all pages from the content
+                for page_num, img in self._extract_content_from_bytes(content, file_ext):
+                    yield (col, page_num, img)
 
     def _should_process_row(self, row: dict[str, Any], subset_config: SubsetConfig) -> bool:
         """Check if row should be processed based on filters.
@@ -137,37 +200,113 @@ class DatasetProcessor:
         Returns:
             True if row should be processed
         """
-        if subset_config.filter_column is None:
-            return True
+        return self._row_filter(subset_config)(row)
 
-        if subset_config.filter_column not in row:
-            return False
+    @staticmethod
+    def _row_filter(subset_config: SubsetConfig) -> Callable[[dict[str, Any]], bool]:
+        """Build the row filter of a subset, specialized to its settings.
+
+        Resolving the filter settings once per subset, with the allowed
+        values in a frozenset, keeps the per-row check to a dict lookup.
+        Unhashable values (list or dict columns, nested lists in the config)
+        fall back to a linear scan of the allowed values.
+
+        Args:
+            subset_config: Subset configuration
+
+        Returns:
+            Function returning True if a row should be processed
+        """
+        column = subset_config.filter_column
+        if column is None:
+            return lambda row: True
 
-        value = row[subset_config.filter_column]
         if subset_config.filter_values is None:
-            return True
+            return lambda row: column in row
 
-        return value in subset_config.filter_values
+        values = tuple(subset_config.filter_values)
+        try:
+            hashed = frozenset(values)
+        except TypeError:
+            return lambda row: column in row and row[column] in values
+
+        def matches(row: dict[str, Any]) -> bool:
+            if column not in row:
+                return False
+            try:
+                return row[column] in hashed
+            except TypeError:
+                return row[column] in values
+
+        return matches
+
+    @staticmethod
+    def _existing_outputs(directory: Path) -> set[str]:
+        """List the file names already present in an output directory.
+
+        One ``os.scandir`` pass replaces a ``Path.exists()`` stat per page
+        when deciding which outputs to skip.
+
+        Args:
+            directory: Output directory for one subset split
+
+        Returns:
+            Set of file names in directory (empty if it doesn't exist yet)
+        """
+        try:
+            with os.scandir(directory) as entries:
+                return {entry.name for entry in entries}
+        except FileNotFoundError:
+            return set()
 
     def process_subset(
-        self, subset_config: SubsetConfig
+        self,
+        subset_config: SubsetConfig,
+        inflight: threading.Semaphore | None = None,
+        decoders: ThreadPoolExecutor | None = None,
     ) -> Generator[tuple[str, str, str | None], None, None]:
         """Process a single dataset subset.
 
         Args:
             subset_config: Subset configuration
+            inflight: Slots for the OCR requests open at once, shared with the
+                other subsets being processed (default: ``_MAX_IN_FLIGHT``
+                slots for this subset alone)
+            decoders: Thread pool extracting images from rows, shared with the
+                other subsets being processed (default: ``_DECODE_WORKERS``
+                threads for this subset alone)
 
         Yields:
             Tuple of (identifier, output_path, result or error)
         """
+        if inflight is None:
+            inflight = threading.BoundedSemaphore(_MAX_IN_FLIGHT)
+        if decoders is None:
+            decoders = ThreadPoolExecutor(max_workers=_DECODE_WORKERS)
+            try:
+                yield from self.process_subset(subset_config, inflight, decoders)
+            finally:
+                # Don't wait, so an abandoned generator can't block on a decoder
+                decoders.shutdown(wait=False)
+            return
+
         for split in subset_config.splits:
-            # Load dataset
-            dataset = load_dataset(
-                self.config.name,
-                name=subset_config.name,
-                split=split,
-                streaming=self.config.streaming,
-            )
+            # Load dataset, preferring local shards written by `ocr preshard`
+            if shards := find_shards(self.config, subset_config.name, split):
+                dataset = load_dataset(
+                    "parquet",
+                    data_files=[str(shard) for shard in shards],
+                    split="train",
+                    streaming=self.config.streaming,
+                    fragment_scan_options=_PARQUET_SCAN_OPTIONS,
+                )
+            else:
+                dataset = load_dataset(
+                    self.config.name,
+                    name=subset_config.name,
+                    split=split,
+                    streaming=self.config.streaming,
+                )
 
             # Apply max samples limit
             if self.config.max_samples:
@@ -176,99 +315,329 @@ class DatasetProcessor:
                 else:
                     dataset = dataset.select(range(min(self.config.max_samples, len(dataset))))
 
-            # Process each row
-            for idx, row in enumerate(dataset):
-                # Check filters
-                if not self._should_process_row(row, subset_config):
-                    continue
+            yield from self._process_split(dataset, subset_config, split, inflight, decoders)
 
-                # Extract images from row
-                images = self._process_row(row, subset_config)
+    def _process_split(
+        self,
+        dataset: Iterable[dict[str, Any]],
+        subset_config: SubsetConfig,
+        split: str,
+        inflight: threading.Semaphore,
+        decoders: ThreadPoolExecutor,
+    ) -> Generator[tuple[str, str, str | None], None, None]:
+        """Process one split as a three-stage pipeline connected by bounded queues.
+
+        A reader thread iterates the dataset, the decoder pool extracts
+        images and rasterizes PDFs, streaming pages out as they are
+        rendered, and an OCR thread sends the decoded images to the server as
+        they arrive, over one event loop and session with a request open per
+        ``inflight`` slot held, and saves the results. Streaming the
+        next rows and rendering PDFs thereby overlap with inference, and the
+        bounded queues keep memory and the server's queue in check. Results
+        are yielded as they finish.
 
+        Args:
+            dataset: Rows of the split
+            subset_config: Subset configuration
+            split: Split name
+            inflight: Slots for the OCR requests open at once
+            decoders: Thread pool extracting images from rows
+
+        Yields:
+            Tuple of (identifier, output_path, result or error)
+
+        Raises:
+            Exception: The first error raised by a stage, such as a failure
+                to stream the dataset, once the pipeline has drained
+        """
+        split_dir = self.config.output_dir / subset_config.name / split
+        # Outputs from earlier runs, read once per split; files written by
+        # this run are never revisited, so the set needs no refresh
+        existing = set() if self.config.overwrite else self._existing_outputs(split_dir)
+
+        # Items: (idx, row)
+        q_rows: queue.Queue[tuple[int, dict[str, Any]] | None] = queue.Queue(
+            maxsize=_PIPELINE_QUEUE_SIZE
+        )
+        # Items: (identifier, output_path, image)
+        q_images: queue.Queue[tuple[str, Path, Image.Image] | None] = queue.Queue(
+            maxsize=_PIPELINE_QUEUE_SIZE
+        )
+        # Items: (identifier, output_path, error), as yielded
+        q_results: queue.Queue[tuple[str, str, str | None] | None] = queue.Queue(
+            maxsize=_PIPELINE_QUEUE_SIZE
+        )
+        errors: list[Exception] = []
+        # Set when a stage fails, so the stages feeding it stop early
+        stop = threading.Event()
+        # Set once the decoders have queued their last image
+        decoded = threading.Event()
+
+        def read() -> None:
+            """Stage 1: stream dataset rows that pass the filters."""
+            should_process = self._row_filter(subset_config)
+            try:
+                for idx, row in enumerate(dataset):
+                    if stop.is_set():
+                        break
+                    if should_process(row):
+                        q_rows.put((idx, row))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                q_rows.put(None)
+
+        # Per-split prefixes, so each image only formats its own suffix
+        id_prefix = f"{subset_config.name}/{split}"
+        split_prefix = os.path.join(split_dir, "")
+
+        def queue_images(idx: int, row: dict[str, Any]) -> None:
+            """Queue the images of a row for OCR as they are decoded, skipping finished ones."""
+            row_id = row.get("path", f"row_{idx}")
+            safe_id = row_id.translate(_SAFE_ID_TABLE).replace(".pdf", "")
+            try:
                 # Process each image (including PDF pages)
-                for col_name, page_num, image in images:
-                    # Generate identifier
-                    row_id = row.get("path", f"row_{idx}")
+                for col_name, page_num, image in self._process_row(row, subset_config):
+                    if stop.is_set():
+                        return
+
+                    # Generate identifier and output file name
                     if page_num > 1:
-                        identifier = (
-                            f"{subset_config.name}/{split}/{row_id}/{col_name}/page{page_num}"
-                        )
+                        identifier = f"{id_prefix}/{row_id}/{col_name}/page{page_num}"
+                        name = f"{safe_id}_{col_name}_page{page_num:03d}.md"
                     else:
-                        identifier = f"{subset_config.name}/{split}/{row_id}/{col_name}"
+                        identifier = f"{id_prefix}/{row_id}/{col_name}"
+                        name = f"{safe_id}_{col_name}.md"
 
-                    try:
-                        # Generate output path
-                        safe_id = row_id.replace("/", "_").replace("\\", "_").replace(".pdf", "")
-                        if page_num > 1:
-                            out_path = (
-                                self.config.output_dir
-                                / subset_config.name
-                                / split
-                                / f"{safe_id}_{col_name}_page{page_num:03d}.md"
-                            )
-                        else:
-                            out_path = (
-                                self.config.output_dir
-                                / subset_config.name
-                                / split
-                                / f"{safe_id}_{col_name}.md"
-                            )
-
-                        # Check if file exists and skip if not overwriting
-                        if out_path.exists() and not self.config.overwrite:
-                            yield (identifier, str(out_path), "skipped (already exists)")
-                            continue
-
-                        # Process with OCR
-                        result = self.client.process_image(image, self.resolution)
-
-                        # Save result
-                        save_markdown(result, out_path)
-
-                        yield (identifier, str(out_path), None)
+                    # Check if file exists and skip if not overwriting
+                    if name in existing:
+                        q_results.put(
+                            (identifier, f"{split_prefix}{name}", "skipped (already exists)")
+                        )
+                        continue
 
+                    q_images.put((identifier, split_dir / name, image))
+            except Exception as e:
+                q_results.put((f"{id_prefix}/{row_id}", "", str(e)))
+
+        # Rows submitted to the decoder pool but not yet decoded, bounded so
+        # one split can't flood the pool the other subsets share
+        decoding = threading.BoundedSemaphore(_PIPELINE_QUEUE_SIZE)
+
+        def on_decoded(future: Future) -> None:
+            decoding.release()
+            if (e := future.exception()) is not None:
+                errors.append(e)
+                stop.set()
+
+        def decode() -> None:
+            """Stage 2: extract images from rows on the decoder pool."""
+            try:
+                while (entry := q_rows.get()) is not None:
+                    # After a failure, rows are only drained to unblock the reader
+                    if stop.is_set():
+                        continue
+                    decoding.acquire()
+                    decoders.submit(queue_images, *entry).add_done_callback(on_decoded)
+            except Exception as e:
+                errors.append(e)
+                # Unblock the reader and wait for its sentinel
+                stop.set()
+                while q_rows.get() is not None:
+                    pass
+            finally:
+                # Wait for the rows still being decoded, so no image is
+                # queued after the sentinel
+                for _ in range(_PIPELINE_QUEUE_SIZE):
+                    decoding.acquire()
+                q_images.put(None)
+                decoded.set()
+
+        async def ocr_images() -> None:
+            """Send images as they arrive, holding an ``inflight`` slot per open request."""
+            loop = asyncio.get_running_loop()
+            tasks: set[asyncio.Task[None]] = set()
+
+            async def ocr_image(identifier: str, out_path: Path, image: Image.Image) -> None:
+                try:
+                    try:
+                        text = await self.client.aprocess_image(
+                            image, self.resolution, session=session
+                        )
                     except Exception as e:
-                        yield (identifier, "", str(e))
+                        result = (identifier, "", str(e))
+                    else:
+                        result = await loop.run_in_executor(
+                            None, self._save_result, identifier, out_path, text
+                        )
+                    await loop.run_in_executor(None, q_results.put, result)
+                finally:
+                    inflight.release()
+
+            # One session for the whole split, so keep-alive connections are
+            # reused and a slow request never holds back the ones behind it
+            batches = iter_batches(q_images, self.batch_size, _BATCH_MAX_WAIT)
+            async with self.client.aio_session(_MAX_IN_FLIGHT) as session:
+                while (
+                    pending := await loop.run_in_executor(None, next, batches, None)
+                ) is not None:
+                    # Send similar-sized images back to back, so they reach the
+                    # server together and share vision encoder batches
+                    for group in group_by_size(pending, lambda item: item[2].size):
+                        for item in group:
+                            # Slots are shared with other subsets' event loops,
+                            # so wait for one off the loop when none is free
+                            if not inflight.acquire(blocking=False):
+                                await loop.run_in_executor(None, inflight.acquire)
+                            task = asyncio.create_task(ocr_image(*item))
+                            tasks.add(task)
+                            task.add_done_callback(tasks.discard)
+                await asyncio.gather(*tasks)
+
+        def ocr() -> None:
+            """Stage 3: OCR images over one event loop and save the results."""
+            try:
+                asyncio.run(ocr_images())
+            except Exception as e:
+                errors.append(e)
+                # Stop the reader and decoders, and drain images until they
+                # are done so none stays blocked on a full queue. The sentinel
+                # may already have been consumed, so wait on the event instead
+                stop.set()
+                while not decoded.is_set() or not q_images.empty():
+                    try:
+                        q_images.get(timeout=_BATCH_MAX_WAIT)
+                    except queue.Empty:
+                        pass
+            finally:
+                q_results.put(None)
+
+        # Daemon threads, so an abandoned generator can't keep the process alive
+        stages = [threading.Thread(target=stage, daemon=True) for stage in (read, decode, ocr)]
+        for stage in stages:
+            stage.start()
+
+        while (result := q_results.get()) is not None:
+            yield result
+
+        for stage in stages:
+            stage.join()
+        if errors:
+            raise errors[0]
+
+    def _save_result(
+        self, identifier: str, out_path: Path, text: str
+    ) -> tuple[str, str, str | None]:
+        """Save the OCR output of one image.
+
+        Args:
+            identifier: Identifier of the image
+            out_path: Markdown output path
+            text: OCR output
+
+        Returns:
+            Tuple of (identifier, output_path, error or None)
+        """
+        try:
+            # Save result, creating each output directory only once
+            if out_path.parent not in self._created_dirs:
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                self._created_dirs.add(out_path.parent)
+            save_markdown(text, out_path, create_parents=False)
+            return (identifier, str(out_path), None)
+        except Exception as e:
+            return (identifier, "", str(e))
 
     def process_all(self) -> dict[str, dict[str, int]]:
         """Process all configured subsets.
 
+        Up to four subsets run at once, each through its own pipeline, so
+        one subset's slow streaming or PDF decoding doesn't leave the server
+        idle. They share one decoder pool and one limit of ``_MAX_IN_FLIGHT``
+        open OCR requests, so running several doesn't multiply either.
+
         Returns:
             Statistics dictionary with counts per subset
         """
-        stats = {}
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-        ) as progress:
-            for subset_config in self.config.subsets:
-                task = progress.add_task(f"Processing {subset_config.name}...", total=None)
-
-                subset_stats = {"success": 0, "error": 0, "skipped": 0, "total": 0}
-
-                for identifier, output_path, error in self.process_subset(subset_config):
-                    subset_stats["total"] += 1
-
-                    if error:
-                        if error.startswith("skipped"):
-                            subset_stats["skipped"] += 1
-                            progress.console.print(f"[yellow]Skipped {identifier} -> {output_path}")
-                        else:
-                            subset_stats["error"] += 1
-                            progress.console.print(f"[red]Error processing {identifier}: {error}")
-                    else:
-                        subset_stats["success"] += 1
-                        progress.console.print(f"[green]Processed {identifier} -> {output_path}")
+        subsets = self.config.subsets
+        if not subsets:
+            return {}
+
+        inflight = threading.BoundedSemaphore(_MAX_IN_FLIGHT)
+        with (
+            Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+            ) as progress,
+            ThreadPoolExecutor(max_workers=_DECODE_WORKERS) as decoders,
+            ThreadPoolExecutor(max_workers=min(len(subsets), _MAX_CONCURRENT_SUBSETS)) as executor,
+        ):
+            futures = [
+                executor.submit(
+                    self._process_subset_with_progress, subset_config, progress, inflight, decoders
+                )
+                for subset_config in subsets
+            ]
+            # Collected in config order; re-raises the first subset failure
+            return {
+                subset_config.name: future.result()
+                for subset_config, future in zip(subsets, futures, strict=True)
+            }
+
+    def _process_subset_with_progress(
+        self,
+        subset_config: SubsetConfig,
+        progress: Progress,
+        inflight: threading.Semaphore,
+        decoders: ThreadPoolExecutor,
+    ) -> dict[str, int]:
+        """Process one subset, reporting on its own progress task.
+
+        Args:
+            subset_config: Subset configuration
+            progress: Rich progress display shared by all subsets
+            inflight: Slots for the OCR requests open at once, shared by all subsets
+            decoders: Thread pool extracting images from rows, shared by all subsets
+
+        Returns:
+            Counts of successful, failed, skipped and total items
+        """
+        task = progress.add_task(f"Processing {subset_config.name}...", total=None)
+
+        subset_stats = {"success": 0, "error": 0, "skipped": 0, "total": 0}
 
-                    progress.update(task, advance=1)
+        pending_advance = 0
+        for identifier, _, error in self.process_subset(subset_config, inflight, decoders):
+            subset_stats["total"] += 1
 
+            if error:
+                if error.startswith("skipped"):
+                    subset_stats["skipped"] += 1
+                else:
+                    subset_stats["error"] += 1
+                    progress.console.print(
+                        f"Error processing {identifier}: {error}", style="red", markup=False
+                    )
+            else:
+                subset_stats["success"] += 1
+
+            # Only errors are printed; the rest show as the latest item in the
+            # task description, updated in steps to avoid a locked repaint per
+            # item
+            pending_advance += 1
+            if pending_advance >= _PROGRESS_STEP:
                 progress.update(
                     task,
-                    description=f"[green]Completed {subset_config.name} "
-                    f"({subset_stats['success']}/{subset_stats['total']} successful, "
-                    f"{subset_stats['skipped']} skipped)",
+                    advance=pending_advance,
+                    description=f"Processing {subset_config.name}... {escape(identifier)}",
                 )
-                stats[subset_config.name] = subset_stats
-
-        return stats
+                pending_advance = 0
+
+        progress.update(
+            task,
+            advance=pending_advance,
+            description=f"[green]Completed {subset_config.name} "
+            f"({subset_stats['success']}/{subset_stats['total']} successful, "
+            f"{subset_stats['skipped']} skipped)",
+        )
+        return subset_stats
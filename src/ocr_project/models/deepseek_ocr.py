@@ -1,9 +1,10 @@
 """DeepSeek-OCR model wrapper for vLLM integration."""
 
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from ocr_project.models.vllm_client import VLLMClient
+from ocr_project.models.vllm_client import RESOLUTION_SIZES, VLLMClient
 from ocr_project.utils.image import load_image
 
 
@@ -18,18 +19,20 @@ class DeepSeekOCR:
         self,
         server_url: str = "http://127.0.0.1:8000/v1",
         resolution: str = "base",
+        max_connections: int = 64,
     ):
         """Initialize the DeepSeek-OCR model with vLLM client.
 
         Args:
             server_url: URL of the running vLLM server
             resolution: Resolution mode (tiny, small, base, large, gundam)
+            max_connections: Connection pool size shared by concurrent requests
 
         Raises:
             RuntimeError: If vLLM server is not running
         """
         self.resolution = resolution
-        self.client = VLLMClient(base_url=server_url)
+        self.client = VLLMClient(base_url=server_url, max_connections=max_connections)
 
         # Health check on initialization
         if not self.client.health_check():
@@ -44,35 +47,45 @@ class DeepSeekOCR:
         Returns:
             Extracted text in markdown format
         """
-        # Load image from path
-        image = load_image(image_path)
+        # Load image from path, decoding JPEGs at reduced scale where possible
+        image = load_image(image_path, max_size=RESOLUTION_SIZES.get(self.resolution))
 
         # Send to vLLM for processing
         return self.client.process_image(image, self.resolution)
 
     def process_batch(
-        self, image_paths: list[Path]
+        self, image_paths: list[Path], max_workers: int = 8
     ) -> Generator[tuple[Path, str | None], None, None]:
-        """Process multiple images, yielding results as they complete.
+        """Process multiple images, yielding results in input order.
 
-        This uses a generator pattern to provide incremental results
-        and allow progress tracking.
+        Images are loaded and sent on a thread pool, so decoding overlaps
+        with OCR and the server can batch concurrent requests. This uses a
+        generator pattern to provide incremental results and allow
+        progress tracking.
 
         Args:
             image_paths: List of paths to image files
+            max_workers: Number of images loaded and processed at once
 
         Yields:
             (image_path, markdown_text) tuples
             markdown_text will be None if processing failed for that image
         """
-        for path in image_paths:
-            try:
-                result = self.process_image(path)
-                yield (path, result)
-            except Exception:
-                # Log error but continue processing
-                # Caller is responsible for handling None results
-                yield (path, None)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            results = executor.map(self._try_process_image, image_paths)
+            yield from zip(image_paths, results, strict=True)
+        finally:
+            # Drop queued images if the caller stops iterating early
+            executor.shutdown(cancel_futures=True)
+
+    def _try_process_image(self, image_path: Path) -> str | None:
+        """Process an image, returning None instead of raising on failure."""
+        try:
+            return self.process_image(image_path)
+        except Exception:
+            # Caller is responsible for handling None results
+            return None
 
     def __enter__(self):
         """Context manager entry."""
@@ -80,6 +93,5 @@ class DeepSeekOCR:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit - cleanup resources."""
-        # VLLMClient doesn't hold resources that need cleanup
-        # Server runs independently
-        pass
+        # Release pooled HTTP connections; the server runs independently
+        self.client.close()
@@ -1,13 +1,72 @@
 """vLLM API client for communicating with OpenAI-compatible server."""
 
-import base64
+import asyncio
+import binascii
+import functools
 import io
+import os
+import random
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import aiohttp
 import httpx
-from openai import OpenAI
+import orjson
 from PIL import Image
 
+# zlib level for PNG uploads: level 1 encodes rendered pages ~25% faster than
+# Pillow's default of 6 for a larger payload, which is cheap on a local
+# connection compared to blocking a submission thread
+_PNG_COMPRESS_LEVEL = 1
+
+# Quality for JPEG uploads; Pillow encodes JPEG with libjpeg-turbo, several
+# times faster than PNG for full-page renders
+_JPEG_QUALITY = 92
+
+# Lossy WebP settings: smaller payloads than JPEG at similar quality; method 2
+# of 0-6 keeps the encode near JPEG speed instead of Pillow's slower default 4
+_WEBP_QUALITY = 90
+_WEBP_METHOD = 2
+
+# Longest image side each resolution mode feeds the model; larger pages are
+# downsampled before encoding since the server would resize them anyway.
+# Gundam mode tiles the full-size page, so it is sent as is.
+RESOLUTION_SIZES = {"tiny": 512, "small": 640, "base": 1024, "large": 1280}
+
+# Default prompt for OCR
+_DEFAULT_PROMPT = "Extract all text from this image and return it in markdown format."
+
+# Stand-in for the image data URI while the request body is serialized
+_IMAGE_PLACEHOLDER = "__ocr_image_data_uri__"
+
+# Request headers for the pre-serialized JSON body
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Failures to reach the server at all, as opposed to errors it returned
+_CONNECTION_ERRORS = (httpx.ConnectError, aiohttp.ClientConnectorError, ConnectionError)
+
+# Transient failures worth retrying; anything else (e.g. a 400 for a
+# malformed request) fails on the first attempt
+_RETRYABLE_ERRORS = (*_CONNECTION_ERRORS, httpx.TimeoutException, TimeoutError)
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+_RETRYABLE_MESSAGE = re.compile(r"rate limit|overload|queue", re.IGNORECASE)
+
+# Threads encoding images for async requests; Pillow's encoders release
+# the GIL, so encodes run in parallel with each other and the event loop
+_ENCODE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Seconds a healthy health check result is reused
+_HEALTH_CACHE_TTL = 30.0
+
+# Monotonic deadline until which each health URL is known to be healthy,
+# shared by all clients so new clients for the same server skip the probe
+_healthy_until: dict[str, float] = {}
+
+# Upper bound on the backoff before a retry, in seconds
+_MAX_BACKOFF = 30.0
+
 
 class ServerNotAvailableError(Exception):
     """Raised when vLLM server is not running or not responsive."""
@@ -21,6 +80,131 @@ class APIError(Exception):
     pass
 
 
+class RateLimiter:
+    """Space requests evenly to stay under a target request rate.
+
+    Slots are reserved under a thread lock and waited for outside it, so one
+    limiter can pace both worker threads and event loops.
+    """
+
+    def __init__(self, target_rps: float):
+        """Initialize rate limiter.
+
+        Args:
+            target_rps: Maximum requests started per second
+        """
+        self.min_interval = 1.0 / target_rps
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve the next request slot.
+
+        Returns:
+            Seconds to wait until the reserved slot
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        return slot - now
+
+    def wait(self) -> None:
+        """Block until the next request may start."""
+        if delay := self._reserve():
+            time.sleep(delay)
+
+    async def await_slot(self) -> None:
+        """Wait without blocking the event loop until the next request may start."""
+        if delay := self._reserve():
+            await asyncio.sleep(delay)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Check whether a failed request may succeed if retried.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        True for connection failures, timeouts, rate limiting and server
+        errors, False otherwise
+    """
+    if isinstance(error, _RETRYABLE_ERRORS):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _RETRYABLE_STATUS
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in _RETRYABLE_STATUS
+    return bool(_RETRYABLE_MESSAGE.search(str(error)))
+
+
+def _backoff(attempt: int) -> float:
+    """Get the jittered exponential delay before retrying an attempt.
+
+    Args:
+        attempt: Zero-based index of the attempt that failed
+
+    Returns:
+        Seconds to wait: 1s, 2s, 4s, ... plus up to 1s of jitter, capped
+    """
+    return min(_MAX_BACKOFF, 2**attempt + random.uniform(0, 1))
+
+
+@functools.lru_cache(maxsize=32)
+def _request_template(prompt: str) -> tuple[bytes, bytes]:
+    """Serialize the chat completion request for a prompt around its image.
+
+    The request is serialized once per prompt and reused byte for byte,
+    which also keeps the prompt prefix identical for vLLM's prefix cache.
+
+    Args:
+        prompt: Text prompt sent with the image
+
+    Returns:
+        (head, tail) JSON bytes surrounding the image data URI
+    """
+    payload = {
+        "model": "deepseek-ai/DeepSeek-OCR",  # Model name expected by vLLM
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": _IMAGE_PLACEHOLDER},
+                    },
+                ],
+            }
+        ],
+        "max_tokens": 4096,  # Allow long OCR outputs
+    }
+    # The image follows the prompt, so its placeholder is the last
+    head, _, tail = orjson.dumps(payload).rpartition(_IMAGE_PLACEHOLDER.encode())
+    return head, tail
+
+
+def _resize_for_resolution(image: Image.Image, resolution: str) -> Image.Image:
+    """Downsample an image to the input size of a resolution mode.
+
+    Args:
+        image: PIL Image object
+        resolution: Resolution mode (tiny/small/base/large/gundam)
+
+    Returns:
+        Image whose longest side fits the mode, or the original image if it
+        already fits or the mode has no fixed size
+    """
+    target = RESOLUTION_SIZES.get(resolution)
+    if target is None or max(image.size) <= target:
+        return image
+
+    scale = target / max(image.size)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.Resampling.BILINEAR)
+
+
 class VLLMClient:
     """Client for communicating with vLLM OpenAI-compatible server."""
 
@@ -29,6 +213,9 @@ class VLLMClient:
         base_url: str = "http://127.0.0.1:8000/v1",
         timeout: int = 300,
         max_retries: int = 3,
+        max_connections: int = 64,
+        image_format: str | None = None,
+        max_rps: float | None = None,
     ):
         """Initialize OpenAI client for vLLM server.
 
@@ -36,34 +223,72 @@ class VLLMClient:
             base_url: Base URL for vLLM OpenAI-compatible API
             timeout: Request timeout in seconds (default 5 minutes)
             max_retries: Maximum number of retry attempts
+            max_connections: Size of the keep-alive connection pool shared by
+                all threads using this client
+            image_format: Upload encoding for page images, "JPEG", "WEBP" or
+                "PNG" (default: $OCR_ENCODE, else JPEG)
+            max_rps: Maximum requests started per second, across all threads
+                and batches using this client (default: unlimited)
         """
         self.base_url = base_url
         self.timeout = timeout
         self.max_retries = max_retries
-
-        # Extract base URL without /v1 for health check
-        self.health_url = base_url.replace("/v1", "/health")
-
-        # Initialize OpenAI client
-        # vLLM OpenAI-compatible server doesn't require a real API key
-        self.client = OpenAI(
-            base_url=base_url,
-            api_key="EMPTY",  # vLLM doesn't validate API keys
+        self.image_format = (image_format or os.environ.get("OCR_ENCODE", "JPEG")).upper()
+        self.rate_limiter = RateLimiter(max_rps) if max_rps else None
+
+        # Endpoints, built once; the health check lives beside /v1, not under it
+        api_url = base_url.rstrip("/")
+        self.health_url = f"{api_url.removesuffix('/v1')}/health"
+        self.completions_url = f"{api_url}/chat/completions"
+
+        # One pooled HTTP client for all requests, so concurrent pages reuse
+        # keep-alive connections instead of reconnecting per request.
+        # Requests are posted directly to the OpenAI-compatible endpoint with
+        # orjson bodies; vLLM doesn't validate API keys, so none is sent.
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
             timeout=timeout,
         )
+        self._encode_pool = ThreadPoolExecutor(
+            max_workers=_ENCODE_WORKERS, thread_name_prefix="ocr-encode"
+        )
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections and stop the encoder threads."""
+        self.http_client.close()
+        self._encode_pool.shutdown(wait=False)
 
-    def health_check(self) -> bool:
+    def health_check(self, force: bool = False) -> bool:
         """Check if vLLM server is running and responsive.
 
+        A healthy result is cached for 30 seconds and shared by every
+        client of the same server, so repeated checks and new clients don't
+        each hit the server. Failures are never cached, and a request that
+        cannot reach the server drops the cached result.
+
+        Args:
+            force: Probe the server even if a healthy result is cached
+
         Returns:
             True if server is healthy, False otherwise
         """
+        if not force and time.monotonic() < _healthy_until.get(self.health_url, 0.0):
+            return True
+
         try:
-            response = httpx.get(self.health_url, timeout=5.0)
-            return response.status_code == 200
+            # Reuses the request pool's keep-alive connections
+            response = self.http_client.get(self.health_url, timeout=5.0)
         except Exception:
             return False
 
+        healthy = response.status_code == 200
+        if healthy:
+            _healthy_until[self.health_url] = time.monotonic() + _HEALTH_CACHE_TTL
+        return healthy
+
     def image_to_base64(self, image: Image.Image, format: str = "PNG") -> str:
         """Convert PIL Image to base64-encoded data URI.
 
@@ -74,17 +299,54 @@ class VLLMClient:
         Returns:
             Data URI string (e.g., "data:image/png;base64,...")
         """
-        # Convert image to bytes
-        buffer = io.BytesIO()
-        image.save(buffer, format=format)
-        img_bytes = buffer.getvalue()
+        return self._encode_image(image, format).decode("ascii")
 
-        # Encode to base64
-        img_base64 = base64.b64encode(img_bytes).decode("utf-8")
+    @classmethod
+    def _encode_image(cls, image: Image.Image, format: str) -> bytes:
+        """Encode a PIL Image as a base64 data URI, kept as bytes.
 
-        # Create data URI
-        mime_type = f"image/{format.lower()}"
-        return f"data:{mime_type};base64,{img_base64}"
+        Args:
+            image: PIL Image object
+            format: Image format (PNG, JPEG or WEBP)
+
+        Returns:
+            ASCII data URI bytes
+        """
+        return b"".join(cls._encode_image_parts(image, format))
+
+    @staticmethod
+    def _encode_image_parts(image: Image.Image, format: str) -> tuple[bytes, bytes]:
+        """Encode a PIL Image as the two halves of a base64 data URI.
+
+        Keeping the header apart from the payload lets callers splice both
+        into a larger body with a single copy of the payload.
+
+        Args:
+            image: PIL Image object
+            format: Image format (PNG, JPEG or WEBP)
+
+        Returns:
+            (data URI header, base64 payload) as ASCII bytes
+        """
+        # Convert image to bytes
+        buffer = io.BytesIO()
+        if format.upper() == "PNG":
+            image.save(buffer, format=format, compress_level=_PNG_COMPRESS_LEVEL)
+        elif format.upper() == "JPEG":
+            # JPEG has no alpha or palette modes
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(buffer, format=format, quality=_JPEG_QUALITY)
+        elif format.upper() == "WEBP":
+            image.save(buffer, format=format, quality=_WEBP_QUALITY, method=_WEBP_METHOD)
+        else:
+            image.save(buffer, format=format)
+
+        # Encode straight from the buffer's memory, without copying it out
+        with buffer.getbuffer() as img_bytes:
+            img_base64 = binascii.b2a_base64(img_bytes, newline=False)
+
+        return b"data:image/" + format.lower().encode() + b";base64,", img_base64
 
     def process_image(
         self, image: Image.Image, resolution: str = "base", prompt: str | None = None
@@ -100,71 +362,142 @@ class VLLMClient:
             Markdown-formatted OCR text
 
         Raises:
-            ServerNotAvailableError: If server is not running
-            APIError: If API request fails after retries
+            ServerNotAvailableError: If the server cannot be reached
+            APIError: If API request fails, after retrying transient errors
         """
-        # Check server health first
-        if not self.health_check():
-            raise ServerNotAvailableError(
-                "vLLM server is not running. Start it with: uv run ocr server"
-            )
-
-        # Convert image to base64
-        image_data_uri = self.image_to_base64(image)
+        body = self._build_request(image, resolution, prompt)
 
-        # Default prompt for OCR
-        if prompt is None:
-            prompt = "Extract all text from this image and return it in markdown format."
-
-        # Retry logic with exponential backoff
+        # Retry transient failures with jittered exponential backoff
         last_exception = None
         for attempt in range(self.max_retries):
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait()
             try:
-                # Create chat completion request with image
-                response = self.client.chat.completions.create(
-                    model="deepseek-ai/DeepSeek-OCR",  # Model name expected by vLLM
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": prompt},
-                                {
-                                    "type": "image_url",
-                                    "image_url": {"url": image_data_uri},
-                                },
-                            ],
-                        }
-                    ],
-                    max_tokens=4096,  # Allow long OCR outputs
+                response = self.http_client.post(
+                    self.completions_url, content=body, headers=_JSON_HEADERS
                 )
+                response.raise_for_status()
+                return self._parse_response(response.content)
+
+            except Exception as e:
+                last_exception = e
+
+                # Give up on the last attempt or an error retrying won't fix
+                if attempt == self.max_retries - 1 or not _is_retryable(e):
+                    raise self._retry_error(e, attempt + 1) from e
+
+                time.sleep(_backoff(attempt))
 
-                # Extract markdown response
-                if response.choices and len(response.choices) > 0:
-                    return response.choices[0].message.content or ""
-                else:
-                    raise APIError("No response content from API")
+        # This should never be reached, but just in case
+        raise APIError(f"Unexpected error: {last_exception}")
+
+    def aio_session(self, max_connections: int) -> aiohttp.ClientSession:
+        """Create an aiohttp session for concurrent requests.
+
+        aiohttp sustains far more in-flight requests than httpx's async
+        client, so it carries the concurrent hot path. Sessions are bound to
+        the event loop they run on: long-running callers should open one per
+        event loop and pass it to aprocess_image, so its keep-alive
+        connections are reused across requests.
+
+        Args:
+            max_connections: Size of the session's connection pool
+
+        Returns:
+            Session to use as an async context manager
+        """
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max_connections, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def aprocess_image(
+        self,
+        image: Image.Image,
+        resolution: str = "base",
+        prompt: str | None = None,
+        session: aiohttp.ClientSession | None = None,
+    ) -> str:
+        """Send image to vLLM for OCR processing without blocking the event loop.
+
+        Args:
+            image: PIL Image object
+            resolution: Resolution mode (tiny/small/base/large/gundam)
+            prompt: Optional custom prompt (default: simple OCR instruction)
+            session: aiohttp session to send the request on (default: a
+                session opened for this call)
+
+        Returns:
+            Markdown-formatted OCR text
+
+        Raises:
+            ServerNotAvailableError: If the server cannot be reached
+            APIError: If API request fails, after retrying transient errors
+        """
+        if session is None:
+            async with self.aio_session(1) as session:
+                return await self.aprocess_image(image, resolution, prompt, session)
+
+        # Encode on the worker pool so the event loop only waits on the network
+        body = await asyncio.get_running_loop().run_in_executor(
+            self._encode_pool, self._build_request, image, resolution, prompt
+        )
+
+        # Retry transient failures with jittered exponential backoff
+        last_exception = None
+        for attempt in range(self.max_retries):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.await_slot()
+            try:
+                return await self._raw_chat(session, body)
 
             except Exception as e:
                 last_exception = e
 
-                # If this is the last attempt, raise the error
-                if attempt == self.max_retries - 1:
-                    raise APIError(
-                        f"API request failed after {self.max_retries} retries: {e}"
-                    ) from e
+                # Give up on the last attempt or an error retrying won't fix
+                if attempt == self.max_retries - 1 or not _is_retryable(e):
+                    raise self._retry_error(e, attempt + 1) from e
 
-                # Exponential backoff: 1s, 2s, 4s
-                wait_time = 2**attempt
-                time.sleep(wait_time)
+                await asyncio.sleep(_backoff(attempt))
 
         # This should never be reached, but just in case
         raise APIError(f"Unexpected error: {last_exception}")
 
+    async def aprocess_batch(
+        self, images: list[Image.Image], resolution: str = "base", max_concurrency: int = 32
+    ) -> list[str | Exception]:
+        """Process multiple images with many requests in flight at once.
+
+        Requests share one aiohttp connection pool, with at most
+        ``max_concurrency`` outstanding, so vLLM can schedule them into the
+        same GPU batches.
+
+        Args:
+            images: List of PIL Image objects
+            resolution: Resolution mode
+            max_concurrency: Maximum requests in flight at once
+
+        Returns:
+            List of markdown text results or the exception raised for that
+            image (same order as input)
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async with self.aio_session(max_concurrency) as session:
+
+            async def guarded(image: Image.Image) -> str:
+                async with semaphore:
+                    return await self.aprocess_image(image, resolution, session=session)
+
+            return await asyncio.gather(
+                *(guarded(image) for image in images), return_exceptions=True
+            )
+
     def process_batch(self, images: list[Image.Image], resolution: str = "base") -> list[str]:
         """Process multiple images in batch.
 
-        Note: Current implementation processes sequentially.
-        Future enhancement: Could use asyncio for concurrent requests.
+        Images are sent concurrently via aprocess_batch; must not be called
+        from a running event loop.
 
         Args:
             images: List of PIL Image objects
@@ -173,12 +506,77 @@ class VLLMClient:
         Returns:
             List of markdown text results (same order as input)
         """
-        results = []
-        for image in images:
-            try:
-                result = self.process_image(image, resolution)
-                results.append(result)
-            except Exception as e:
-                # Continue processing on errors, append empty string
-                results.append(f"Error processing image: {e}")
-        return results
+        results = asyncio.run(self.aprocess_batch(images, resolution))
+        # Continue processing on errors, reporting them in place of the text
+        return [
+            f"Error processing image: {result}" if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+    def _build_request(self, image: Image.Image, resolution: str, prompt: str | None) -> bytes:
+        """Build the serialized chat completion request for an image.
+
+        Args:
+            image: PIL Image object
+            resolution: Resolution mode the image is downsampled to
+            prompt: Optional custom prompt (default: simple OCR instruction)
+
+        Returns:
+            JSON request body
+        """
+        image = _resize_for_resolution(image, resolution)
+
+        # Splice the base64 data URI into the serialized request as bytes, so
+        # the multi-megabyte payload is neither decoded to str nor scanned by
+        # orjson
+        head, tail = _request_template(_DEFAULT_PROMPT if prompt is None else prompt)
+        header, payload = self._encode_image_parts(image, self.image_format)
+        return b"".join((head, header, payload, tail))
+
+    @staticmethod
+    def _parse_response(content: bytes) -> str:
+        """Extract the markdown text from a chat completion response body.
+
+        Raises:
+            APIError: If the response has no choices
+        """
+        choices = orjson.loads(content).get("choices")
+        if choices:
+            return choices[0]["message"]["content"] or ""
+        raise APIError("No response content from API")
+
+    def _retry_error(self, error: Exception, attempts: int) -> Exception:
+        """Classify the error that ended the attempts at a request.
+
+        Args:
+            error: Exception raised by the final attempt
+            attempts: Number of attempts made
+
+        Returns:
+            ServerNotAvailableError if the server could not be reached,
+            otherwise APIError
+        """
+        if isinstance(error, _CONNECTION_ERRORS):
+            _healthy_until.pop(self.health_url, None)
+            return ServerNotAvailableError(
+                "vLLM server is not running. Start it with: uv run ocr server"
+            )
+        return APIError(f"API request failed after {attempts} attempt(s): {error}")
+
+    async def _raw_chat(self, session: aiohttp.ClientSession, body: bytes) -> str:
+        """POST a serialized request to the chat completions endpoint.
+
+        Args:
+            session: aiohttp session to send the request on
+            body: JSON request body
+
+        Returns:
+            Markdown text from the first choice
+
+        Raises:
+            aiohttp.ClientResponseError: If the server returns an error status
+            APIError: If the response has no choices
+        """
+        async with session.post(self.completions_url, data=body, headers=_JSON_HEADERS) as r:
+            r.raise_for_status()
+            return self._parse_response(await r.read())
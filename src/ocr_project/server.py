@@ -27,6 +27,9 @@ Examples:
 
   # Adjust GPU memory and tensor parallelism
   uv run ocr-server --gpu-memory-utilization 0.95 --tensor-parallel-size 1
+
+  # Allow more concurrent pages per scheduler step
+  uv run ocr-server --max-num-seqs 128 --max-num-batched-tokens 16384
         """,
     )
 
@@ -66,6 +69,25 @@ Examples:
         default=None,
         help="Maximum model context length (default: model's max)",
     )
+    parser.add_argument(
+        "--max-num-seqs",
+        type=int,
+        default=64,
+        help="Maximum requests batched per scheduler step (default: 64)",
+    )
+    parser.add_argument(
+        "--max-num-batched-tokens",
+        type=int,
+        default=8192,
+        help="Maximum tokens batched per scheduler step (default: 8192)",
+    )
+    parser.add_argument(
+        "--enable-prefix-caching",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Share the KV cache of the common OCR prompt prefix across requests "
+        "(default: enabled)",
+    )
 
     args = parser.parse_args()
 
@@ -75,6 +97,8 @@ Examples:
     print(f"Port: {args.port}")
     print(f"GPU Memory Utilization: {args.gpu_memory_utilization}")
     print(f"Tensor Parallel Size: {args.tensor_parallel_size}")
+    print(f"Max Num Seqs: {args.max_num_seqs}")
+    print(f"Max Num Batched Tokens: {args.max_num_batched_tokens}")
     print()
     print("Once started, access the API at:")
     print(f"  OpenAI-compatible endpoint: http://{args.host}:{args.port}/v1")
@@ -98,6 +122,14 @@ Examples:
         "--tensor-parallel-size",
         str(args.tensor_parallel_size),
         "--trust-remote-code",
+        "--max-num-seqs",
+        str(args.max_num_seqs),
+        "--max-num-batched-tokens",
+        str(args.max_num_batched_tokens),
+        # One image per request, so no KV cache is reserved for more
+        "--limit-mm-per-prompt",
+        '{"image": 1}',
+        "--enable-prefix-caching" if args.enable_prefix_caching else "--no-enable-prefix-caching",
     ]
 
     if args.max_model_len:
@@ -0,0 +1,63 @@
+"""Micro-batching utilities for grouping OCR requests."""
+
+import queue
+import time
+from collections.abc import Callable, Iterator
+
+# Width/height granularity (pixels) used to bucket images of similar size
+SIZE_BUCKET = 256
+
+
+def iter_batches[T](
+    source: "queue.Queue[T | None]", max_batch_size: int, max_wait: float
+) -> Iterator[list[T]]:
+    """Collect items from a queue into micro-batches.
+
+    A batch is emitted when it reaches ``max_batch_size`` items or when
+    ``max_wait`` seconds have passed since its first item arrived,
+    whichever comes first. Iteration stops at a ``None`` sentinel, after
+    flushing any partial batch.
+
+    Args:
+        source: Queue to drain, terminated by a ``None`` sentinel
+        max_batch_size: Maximum number of items per batch
+        max_wait: Maximum seconds to wait for a batch to fill
+
+    Yields:
+        Non-empty lists of items in arrival order
+    """
+    while (item := source.get()) is not None:
+        batch = [item]
+        deadline = time.monotonic() + max_wait
+
+        while len(batch) < max_batch_size:
+            try:
+                item = source.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is None:
+                yield batch
+                return
+            batch.append(item)
+
+        yield batch
+
+
+def group_by_size[T](items: list[T], size: Callable[[T], tuple[int, int]]) -> list[list[T]]:
+    """Group items whose images have similar dimensions.
+
+    Images are bucketed by width and height in ``SIZE_BUCKET`` pixel
+    steps, so pages rendered at the same size are dispatched together.
+
+    Args:
+        items: Items to group
+        size: Function returning the (width, height) of an item's image
+
+    Returns:
+        List of groups, in order of each group's first item
+    """
+    buckets: dict[tuple[int, int], list[T]] = {}
+    for item in items:
+        width, height = size(item)
+        buckets.setdefault((width // SIZE_BUCKET, height // SIZE_BUCKET), []).append(item)
+    return list(buckets.values())
@@ -3,15 +3,20 @@
 from pathlib import Path
 
 
-def save_markdown(content: str, output_path: Path) -> None:
+def save_markdown(content: str, output_path: Path, create_parents: bool = True) -> None:
     """Save markdown content to a file.
 
     Args:
         content: Markdown content to save
         output_path: Path to output file
+        create_parents: Create the parent directory first. Callers writing many
+            files into known directories can pass False to skip the mkdir.
     """
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(content, encoding="utf-8")
+    if create_parents:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Encode once and write bytes, bypassing the text I/O layer
+    with open(output_path, "wb") as f:
+        f.write(content.encode("utf-8"))
 
 
 def read_markdown(input_path: Path) -> str:
@@ -1,15 +1,72 @@
 """Image loading and preprocessing utilities."""
 
+import math
+import os
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 from PIL import Image
 
+# File extensions treated as images, as a tuple for a single str.endswith
+_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp")
 
-def load_image(image_path: Path) -> Image.Image:
+
+def draft_image(img: Image.Image, max_size: int) -> None:
+    """Configure an opened, not yet decoded image to decode at reduced scale.
+
+    JPEGs are decoded at the smallest DCT scale (1/2, 1/4 or 1/8) whose
+    longest side still covers ``max_size``, which skips most of the decode
+    work for large photos. Other formats are left unchanged.
+
+    Args:
+        img: Image returned by Image.open, before it is loaded
+        max_size: Longest side the image will be downsampled to
+    """
+    if max(img.size) > max_size:
+        scale = max_size / max(img.size)
+        img.draft(None, (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+
+
+def open_image(image_path: Path) -> Image.Image:
+    """Open an image without decoding its pixels.
+
+    Only the header is parsed and the file structure checked, so size and
+    format are available cheaply; pixel data is decoded on first access.
+    Use load_image when the pixels are needed right away.
+
+    Args:
+        image_path: Path to the image file
+
+    Returns:
+        Lazily decoded PIL Image object
+
+    Raises:
+        FileNotFoundError: If image file doesn't exist
+        ValueError: If file is not a valid image
+    """
+    # Let the open report a missing file rather than stat'ing it beforehand
+    try:
+        with Image.open(image_path) as img:
+            img.verify()
+        # verify() leaves the image unusable, so reopen for the caller
+        return Image.open(image_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Image not found: {image_path}") from None
+    except Exception as e:
+        raise ValueError(f"Invalid image file {image_path}: {e}") from e
+
+
+def load_image(image_path: Path, max_size: int | None = None) -> Image.Image:
     """Load an image from a file path.
 
     Args:
         image_path: Path to the image file
+        max_size: Longest side the image will be downsampled to after
+            loading. JPEGs are then decoded at a reduced scale (1/2, 1/4 or
+            1/8) that still covers it, which skips most of the decode work
+            for large photos. Other formats are decoded at full size.
 
     Returns:
         PIL Image object
@@ -18,17 +75,44 @@ def load_image(image_path: Path) -> Image.Image:
         FileNotFoundError: If image file doesn't exist
         ValueError: If file is not a valid image
     """
-    if not image_path.exists():
-        raise FileNotFoundError(f"Image not found: {image_path}")
-
+    # Let the open report a missing file rather than stat'ing it beforehand
     try:
         img = Image.open(image_path)
+        if max_size:
+            draft_image(img, max_size)
         img.load()  # Verify image is valid
         return img
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Image not found: {image_path}") from None
     except Exception as e:
         raise ValueError(f"Invalid image file {image_path}: {e}") from e
 
 
+def load_images_parallel(
+    paths: Iterable[Path], max_workers: int | None = None, max_size: int | None = None
+) -> list[Image.Image]:
+    """Load many images at once on a thread pool.
+
+    Pillow releases the GIL while reading and decoding (``img.load()``), so
+    the loads run in parallel across threads.
+
+    Args:
+        paths: Paths to the image files
+        max_workers: Number of loader threads (default: CPU count + 4, at most 32)
+        max_size: Longest side the images will be downsampled to, as for
+            load_image
+
+    Returns:
+        PIL Image objects, in the order of ``paths``
+
+    Raises:
+        FileNotFoundError: If an image file doesn't exist
+        ValueError: If a file is not a valid image
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(partial(load_image, max_size=max_size), paths))
+
+
 def get_image_files(directory: Path) -> list[Path]:
     """Get all image files from a directory.
 
@@ -38,5 +122,11 @@ def get_image_files(directory: Path) -> list[Path]:
     Returns:
         List of image file paths
     """
-    image_extensions = {".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp"}
-    return [f for f in directory.iterdir() if f.is_file() and f.suffix.lower() in image_extensions]
+    # scandir entries carry their file type from the directory listing, so
+    # only symlinks need a stat; Paths are only built for matches
+    with os.scandir(directory) as entries:
+        return [
+            Path(entry.path)
+            for entry in entries
+            if entry.name.lower().endswith(_IMAGE_EXTENSIONS) and entry.is_file()
+        ]
@@ -1,17 +1,46 @@
 """PDF processing utilities for converting PDFs to images."""
 
+import functools
+import os
+import tempfile
+import threading
+from collections.abc import Iterator
 from pathlib import Path
 
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
 
+# pdfium renders in-process without forking poppler for every call; it is
+# only used when installed (the "pdfium" extra) and selected
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover - depends on the optional extra
+    pdfium = None
 
-def pdf_to_images(pdf_path: Path, dpi: int = 200) -> list[tuple[int, Image.Image]]:
+# Poppler processes used to render a whole document at once
+_DEFAULT_THREAD_COUNT = min(8, os.cpu_count() or 1)
+
+# PDF rasterizers for the streaming converters
+_BACKENDS = ("poppler", "pdfium")
+
+# pdfium is not thread-safe, so calls into it are serialized
+_PDFIUM_LOCK = threading.Lock()
+
+
+def pdf_to_images(
+    pdf_path: Path, dpi: int = 200, thread_count: int | None = None, backend: str | None = None
+) -> list[tuple[int, Image.Image]]:
     """Convert PDF to list of (page_number, image) tuples.
 
+    This holds every page in memory at once; prefer pdf_to_images_iter
+    for large documents.
+
     Args:
         pdf_path: Path to PDF file
         dpi: Resolution for conversion (default 200, higher = better quality but slower)
+        thread_count: Number of poppler processes rendering page ranges in
+            parallel (default: up to 8, one per CPU)
+        backend: "poppler" or "pdfium" (default: $OCR_PDF_BACKEND, else poppler)
 
     Returns:
         List of (page_num, PIL.Image) tuples, 1-indexed
@@ -19,15 +48,20 @@ def pdf_to_images(pdf_path: Path, dpi: int = 200) -> list[tuple[int, Image.Image
 
     Raises:
         FileNotFoundError: If PDF doesn't exist
-        ValueError: If PDF is invalid or corrupted
+        ValueError: If PDF is invalid or corrupted, or backend is unknown
     """
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
 
+    if _resolve_backend(backend) == "pdfium":
+        return list(_iter_pages_pdfium(pdf_path, dpi, str(pdf_path)))
+
     try:
         # Convert PDF to list of PIL Images
         # pdf2image uses poppler under the hood
-        images = convert_from_path(pdf_path, dpi=dpi)
+        images = convert_from_path(
+            pdf_path, dpi=dpi, thread_count=thread_count or _DEFAULT_THREAD_COUNT
+        )
 
         # Return as (page_number, image) tuples, 1-indexed
         return [(i + 1, img) for i, img in enumerate(images)]
@@ -36,6 +70,185 @@ def pdf_to_images(pdf_path: Path, dpi: int = 200) -> list[tuple[int, Image.Image
         raise ValueError(f"Failed to convert PDF {pdf_path}: {e}") from e
 
 
+def pdf_bytes_to_images_iter(
+    content: bytes, dpi: int = 200, pages_per_batch: int = 4, backend: str | None = None
+) -> Iterator[tuple[int, Image.Image]]:
+    """Lazily convert an in-memory PDF to (page_number, image) tuples.
+
+    With poppler, the bytes are spooled to a temporary file once (poppler
+    reads from disk), which is removed when iteration finishes or the
+    iterator is closed, and pages are rasterized ``pages_per_batch`` at a
+    time. pdfium renders one page at a time straight from memory.
+
+    Args:
+        content: Raw PDF file bytes
+        dpi: Resolution for conversion (default 200, higher = better quality but slower)
+        pages_per_batch: Number of pages rasterized per poppler call
+        backend: "poppler" or "pdfium" (default: $OCR_PDF_BACKEND, else poppler)
+
+    Yields:
+        (page_num, PIL.Image) tuples, 1-indexed
+
+    Raises:
+        ValueError: If PDF is invalid or corrupted, or backend is unknown
+    """
+    if _resolve_backend(backend) == "pdfium":
+        yield from _iter_pages_pdfium(content, dpi, "from bytes")
+        return
+
+    fd, name = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        # Read directly rather than through the page count cache, which
+        # would only fill up with one-off temporary file names
+        try:
+            page_count = int(pdfinfo_from_path(name)["Pages"])
+        except Exception as e:
+            raise ValueError(f"Failed to convert PDF from bytes: {e}") from e
+        yield from _iter_pages(Path(name), dpi, page_count, pages_per_batch)
+    finally:
+        os.unlink(name)
+
+
+def get_pdf_page_count(pdf_path: Path, backend: str | None = None) -> int:
+    """Get the number of pages in a PDF without rasterizing it.
+
+    The count comes from the backend that renders the pages, since poppler
+    and pdfium can disagree on damaged files. Counts are cached per file
+    path, modification time, size and backend, so re-enumerating unchanged
+    PDFs (e.g. when resuming a run) skips reading them again.
+
+    Args:
+        pdf_path: Path to PDF file
+        backend: "poppler" or "pdfium" (default: $OCR_PDF_BACKEND, else poppler)
+
+    Returns:
+        Number of pages
+
+    Raises:
+        FileNotFoundError: If PDF doesn't exist
+        ValueError: If PDF is invalid or corrupted, or backend is unknown
+    """
+    backend = _resolve_backend(backend)
+    try:
+        stat = pdf_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}") from None
+
+    # Keyed on modification time and size, so an edited file is re-read
+    return _cached_page_count(str(pdf_path), stat.st_mtime_ns, stat.st_size, backend)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_page_count(pdf_path: str, mtime_ns: int, size: int, backend: str) -> int:
+    """Read a PDF's page count with a backend, memoized per file version."""
+    try:
+        if backend == "pdfium":
+            with _PDFIUM_LOCK:
+                pdf = pdfium.PdfDocument(pdf_path)
+                try:
+                    return len(pdf)
+                finally:
+                    pdf.close()
+        # Reads the page count from PDF metadata (poppler's pdfinfo)
+        return int(pdfinfo_from_path(pdf_path)["Pages"])
+    except Exception as e:
+        raise ValueError(f"Failed to read PDF {pdf_path}: {e}") from e
+
+
+def pdf_to_images_iter(
+    pdf_path: Path,
+    dpi: int = 200,
+    pages_per_batch: int = 4,
+    page_count: int | None = None,
+    backend: str | None = None,
+) -> Iterator[tuple[int, Image.Image]]:
+    """Lazily convert a PDF to (page_number, image) tuples.
+
+    Pages are rasterized a few at a time, so peak memory is bounded by
+    ``pages_per_batch`` pages rather than the whole document.
+
+    Args:
+        pdf_path: Path to PDF file
+        dpi: Resolution for conversion (default 200, higher = better quality but slower)
+        pages_per_batch: Number of pages rasterized per poppler call
+        page_count: Page count if already known (skips reading PDF metadata)
+        backend: "poppler" or "pdfium" (default: $OCR_PDF_BACKEND, else poppler)
+
+    Returns:
+        Iterator of (page_num, PIL.Image) tuples, 1-indexed
+
+    Raises:
+        FileNotFoundError: If PDF doesn't exist
+        ValueError: If PDF is invalid or corrupted (raised eagerly for
+            unreadable files, or during iteration if a page fails to render),
+            or backend is unknown
+    """
+    if _resolve_backend(backend) == "pdfium":
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        return _iter_pages_pdfium(pdf_path, dpi, str(pdf_path))
+
+    if page_count is None:
+        page_count = get_pdf_page_count(pdf_path)
+    return _iter_pages(pdf_path, dpi, page_count, pages_per_batch)
+
+
+def _iter_pages(
+    pdf_path: Path, dpi: int, page_count: int, pages_per_batch: int
+) -> Iterator[tuple[int, Image.Image]]:
+    """Yield pages of a PDF, rasterizing ``pages_per_batch`` pages at a time."""
+    for first_page in range(1, page_count + 1, pages_per_batch):
+        last_page = min(first_page + pages_per_batch - 1, page_count)
+        try:
+            images = convert_from_path(
+                pdf_path, dpi=dpi, first_page=first_page, last_page=last_page
+            )
+        except Exception as e:
+            raise ValueError(f"Failed to convert PDF {pdf_path}: {e}") from e
+
+        yield from enumerate(images, start=first_page)
+
+
+def _resolve_backend(backend: str | None) -> str:
+    """Pick the PDF rasterizer, defaulting to $OCR_PDF_BACKEND or poppler."""
+    backend = (backend or os.environ.get("OCR_PDF_BACKEND", "poppler")).lower()
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown PDF backend {backend!r}, expected one of {_BACKENDS}")
+    if backend == "pdfium" and pdfium is None:
+        raise ValueError("The pdfium backend requires pypdfium2 (install the 'pdfium' extra)")
+    return backend
+
+
+def _iter_pages_pdfium(
+    source: Path | bytes, dpi: int, name: str
+) -> Iterator[tuple[int, Image.Image]]:
+    """Yield pages of a PDF rendered in-process by pdfium, one at a time."""
+    try:
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(source)
+            page_count = len(pdf)
+    except Exception as e:
+        raise ValueError(f"Failed to convert PDF {name}: {e}") from e
+
+    try:
+        for page_num in range(1, page_count + 1):
+            try:
+                with _PDFIUM_LOCK:
+                    page = pdf[page_num - 1]
+                    try:
+                        image = page.render(scale=dpi / 72).to_pil()
+                    finally:
+                        page.close()
+            except Exception as e:
+                raise ValueError(f"Failed to convert PDF {name}: {e}") from e
+            yield page_num, image
+    finally:
+        with _PDFIUM_LOCK:
+            pdf.close()
+
+
 def is_pdf(file_path: Path) -> bool:
     """Check if file is a PDF by extension.
 
@@ -46,3 +259,22 @@ def is_pdf(file_path: Path) -> bool:
         True if file has .pdf extension (case-insensitive)
     """
     return file_path.suffix.lower() == ".pdf"
+
+
+def get_pdf_files(directory: Path) -> list[Path]:
+    """Get all PDF files from a directory.
+
+    Args:
+        directory: Directory to search for PDFs
+
+    Returns:
+        List of PDF file paths
+    """
+    # Same single scandir pass as get_image_files: file types come from the
+    # directory listing and Paths are only built for matches
+    with os.scandir(directory) as entries:
+        return [
+            Path(entry.path)
+            for entry in entries
+            if entry.name.lower().endswith(".pdf") and entry.is_file()
+        ]
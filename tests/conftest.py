@@ -0,0 +1,24 @@
+"""Shared pytest fixtures."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from ocr_project.models import vllm_client
+
+
+@pytest.fixture(autouse=True)
+def _clear_health_cache():
+    """Start every test without cached server health results."""
+    vllm_client._healthy_until.clear()
+    yield
+    vllm_client._healthy_until.clear()
+
+
+@pytest.fixture(scope="session")
+def tiny_png_bytes() -> bytes:
+    """PNG-encoded bytes of a 10x10 red image, encoded once per session."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (10, 10), color="red").save(buffer, format="PNG")
+    return buffer.getvalue()
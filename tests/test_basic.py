@@ -37,3 +37,21 @@ def test_vllm_client_import():
     from ocr_project.models.vllm_client import VLLMClient
 
     assert VLLMClient is not None
+
+
+def test_dataset_package_lazy_imports():
+    """Test importing the dataset package defers its heavy dependencies."""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "import ocr_project.dataset\n"
+        "print(sorted(m for m in ('datasets', 'pyarrow', 'rich') if m in sys.modules))\n"
+        "from ocr_project.dataset import DatasetExporter\n"
+        "print(DatasetExporter.__name__)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.splitlines() == ["[]", "DatasetExporter"]
@@ -0,0 +1,52 @@
+"""Tests for micro-batching utilities."""
+
+import queue
+import threading
+import time
+
+from ocr_project.utils.batching import group_by_size, iter_batches
+
+
+class TestIterBatches:
+    """Tests for iter_batches."""
+
+    def test_splits_by_max_batch_size(self):
+        """Test full batches are emitted as soon as they fill."""
+        source = queue.Queue()
+        for item in [1, 2, 3, 4, 5, None]:
+            source.put(item)
+
+        assert list(iter_batches(source, max_batch_size=2, max_wait=1.0)) == [[1, 2], [3, 4], [5]]
+
+    def test_flushes_partial_batch_after_max_wait(self):
+        """Test a partial batch is emitted when no more items arrive in time."""
+        source = queue.Queue()
+        source.put(1)
+
+        def finish():
+            time.sleep(0.2)
+            source.put(2)
+            source.put(None)
+
+        threading.Thread(target=finish).start()
+
+        assert list(iter_batches(source, max_batch_size=8, max_wait=0.05)) == [[1], [2]]
+
+    def test_empty_source(self):
+        """Test a lone sentinel yields no batches."""
+        source = queue.Queue()
+        source.put(None)
+
+        assert list(iter_batches(source, max_batch_size=4, max_wait=0.01)) == []
+
+
+class TestGroupBySize:
+    """Tests for group_by_size."""
+
+    def test_groups_similar_sizes(self):
+        """Test items are grouped by bucketed dimensions, preserving order."""
+        items = [("a", (1700, 2200)), ("b", (100, 100)), ("c", (1720, 2210)), ("d", (120, 90))]
+
+        groups = group_by_size(items, lambda item: item[1])
+
+        assert [[name for name, _ in group] for group in groups] == [["a", "c"], ["b", "d"]]
@@ -1,11 +1,23 @@
 """Tests for CLI commands."""
 
+import os
+import shutil
+import subprocess
+import sys
 import tempfile
+import threading
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
+import click
+import pytest
 from click.testing import CliRunner
+from PIL import Image
 
-from ocr_project.cli.main import cli
+from ocr_project.cli.main import _get_model, _iter_inputs, _run_pipeline, cli
+
+# Single blank 1x2 inch page
+_DUMMY_PDF = Path(__file__).parent / "fixtures" / "dummy.pdf"
 
 
 class TestCLI:
@@ -18,6 +30,36 @@ class TestCLI:
         assert result.exit_code == 0
         assert "OCR processing" in result.output
 
+    def test_cli_help_skips_heavy_imports(self):
+        """Test --help does not import the model, PDF, image or progress stacks."""
+        code = (
+            "import sys\n"
+            "from ocr_project.cli.main import cli\n"
+            "try:\n"
+            "    cli(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "heavy = ('openai', 'httpx', 'PIL', 'pdf2image', 'rich', 'datasets', 'pandas')\n"
+            "print(sorted(m for m in heavy if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip().splitlines()[-1] == "[]"
+
+    def test_get_model_memoized_on_context(self):
+        """Test commands sharing a context obj reuse one model per configuration."""
+        shared: dict = {}
+        with patch("ocr_project.models.deepseek_ocr.DeepSeekOCR") as mock_model:
+            mock_model.side_effect = lambda **_: MagicMock()
+            first = _get_model(click.Context(cli, obj=shared), "base", 16)
+            second = _get_model(click.Context(cli, obj=shared), "base", 16)
+            other = _get_model(click.Context(cli, obj=shared), "large", 16)
+
+        assert first is second
+        assert other is not first
+        assert mock_model.call_count == 2
+
     def test_process_command_help(self):
         """Test process command help."""
         runner = CliRunner()
@@ -59,3 +101,272 @@ class TestCLI:
             result = runner.invoke(cli, ["batch", tmpdir, "--output", str(output_dir)])
             # Command should handle server error gracefully (not crash)
             assert "vLLM server is not running" in result.output
+
+
+class TestBatchPipeline:
+    """Tests for the batch processing pipeline."""
+
+    def test_run_pipeline_mirrors_structure(self):
+        """Test pipeline OCRs every image and mirrors the input directory tree."""
+        from rich.progress import Progress
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_dir = Path(tmpdir) / "input"
+            output_dir = Path(tmpdir) / "output"
+            (input_dir / "nested").mkdir(parents=True)
+            Image.new("RGB", (10, 10), color="red").save(input_dir / "a.png")
+            Image.new("RGB", (10, 10), color="blue").save(input_dir / "nested" / "b.png")
+            (input_dir / "broken.png").write_bytes(b"not an image")
+
+            model = MagicMock()
+            model.client.process_image.return_value = "# OCR result"
+            files = _iter_inputs(input_dir, frozenset({"png"}))
+
+            with Progress(disable=True) as progress:
+                task = progress.add_task("test", total=None)
+                file_count, processed, total_pages, error_count = _run_pipeline(
+                    model, files, input_dir, output_dir, "base", 2, 2, 4, progress, task, workers=2
+                )
+                assert progress.tasks[0].total == 3
+                assert progress.tasks[0].completed == 3
+
+            assert file_count == 3
+            assert processed == 2
+            assert total_pages == 0
+            assert error_count == 1
+            error_lines = (output_dir / "errors.txt").read_text().splitlines()
+            assert [line.split(": ")[0] for line in error_lines] == [str(input_dir / "broken.png")]
+            assert (output_dir / "a.md").read_text() == "# OCR result"
+            assert (output_dir / "nested" / "b.md").read_text() == "# OCR result"
+
+    def test_run_pipeline_single_file(self):
+        """Test --single-file combines PDF pages into one markdown file in page order."""
+        from rich.progress import Progress
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_dir = Path(tmpdir) / "input"
+            output_dir = Path(tmpdir) / "output"
+            input_dir.mkdir()
+            pdf_path = input_dir / "doc.pdf"
+            pdf_path.touch()
+            pages = [(n, Image.new("RGB", (10, 10))) for n in (1, 2, 3)]
+
+            model = MagicMock()
+            model.client.process_image.return_value = "text"
+
+            with (
+                patch("ocr_project.utils.pdf.get_pdf_page_count", return_value=3),
+                patch("ocr_project.utils.pdf.pdf_to_images_iter", return_value=iter(pages)),
+                Progress(disable=True) as progress,
+            ):
+                task = progress.add_task("test", total=None)
+                _, processed, total_pages, error_count = _run_pipeline(
+                    model,
+                    [pdf_path],
+                    input_dir,
+                    output_dir,
+                    "base",
+                    2,
+                    2,
+                    4,
+                    progress,
+                    task,
+                    single_file=True,
+                )
+                # Progress counts PDF pages, read from metadata during the scan
+                assert progress.tasks[0].total == 3
+                assert progress.tasks[0].completed == 3
+
+            assert (processed, total_pages, error_count) == (3, 3, 0)
+            assert not (output_dir / "errors.txt").exists()
+            assert sorted(p.name for p in output_dir.iterdir()) == ["doc.md"]
+            content = (output_dir / "doc.md").read_text()
+            assert content == "# Page 1\n\ntext\n\n# Page 2\n\ntext\n\n# Page 3\n\ntext"
+
+    def test_run_pipeline_single_file_short_render(self):
+        """Test a PDF rendering fewer pages than its page count still completes."""
+        from rich.progress import Progress
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_dir = Path(tmpdir) / "input"
+            output_dir = Path(tmpdir) / "output"
+            input_dir.mkdir()
+            pdf_path = input_dir / "doc.pdf"
+            pdf_path.touch()
+            pages = [(n, Image.new("RGB", (10, 10))) for n in (1, 2)]
+
+            model = MagicMock()
+            model.client.process_image.return_value = "text"
+
+            with (
+                patch("ocr_project.utils.pdf.get_pdf_page_count", return_value=3),
+                patch("ocr_project.utils.pdf.pdf_to_images_iter", return_value=iter(pages)),
+                Progress(disable=True) as progress,
+            ):
+                task = progress.add_task("test", total=None)
+                _, processed, total_pages, error_count = _run_pipeline(
+                    model,
+                    [pdf_path],
+                    input_dir,
+                    output_dir,
+                    "base",
+                    2,
+                    2,
+                    4,
+                    progress,
+                    task,
+                    single_file=True,
+                )
+                assert progress.tasks[0].completed == 3
+
+            assert (processed, total_pages, error_count) == (2, 2, 1)
+            error_lines = (output_dir / "errors.txt").read_text().splitlines()
+            assert error_lines == [f"{pdf_path}: rendered fewer pages than the 3 in its metadata"]
+            content = (output_dir / "doc.md").read_text()
+            assert content == "# Page 1\n\ntext\n\n# Page 2\n\ntext"
+
+    def test_run_pipeline_pdfium_page_count(self, monkeypatch):
+        """Test the pdfium backend also counts the pages it renders, without poppler."""
+        pytest.importorskip("pypdfium2")
+        from rich.progress import Progress
+
+        monkeypatch.setenv("OCR_PDF_BACKEND", "pdfium")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_dir = Path(tmpdir) / "input"
+            output_dir = Path(tmpdir) / "output"
+            input_dir.mkdir()
+            shutil.copy(_DUMMY_PDF, input_dir / "doc.pdf")
+
+            model = MagicMock()
+            model.client.process_image.return_value = "text"
+
+            with (
+                # A poppler count disagreeing with pdfium must not be used
+                patch("ocr_project.utils.pdf.pdfinfo_from_path", return_value={"Pages": 3}),
+                Progress(disable=True) as progress,
+            ):
+                task = progress.add_task("test", total=None)
+                _, processed, total_pages, error_count = _run_pipeline(
+                    model,
+                    [input_dir / "doc.pdf"],
+                    input_dir,
+                    output_dir,
+                    "base",
+                    2,
+                    2,
+                    4,
+                    progress,
+                    task,
+                )
+                assert progress.tasks[0].total == 1
+                assert progress.tasks[0].completed == 1
+
+            assert (processed, total_pages, error_count) == (1, 1, 0)
+            assert (output_dir / "doc_page001.md").read_text() == "text"
+
+    def _run_pipeline_in_thread(self, tmpdir: str, output_dir: Path) -> list[Exception]:
+        """Run the pipeline over more pages than its queues hold, in a thread.
+
+        Returns the exceptions raised, once the pipeline has shut down.
+        """
+        from rich.progress import Progress
+
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        for i in range(100):
+            Image.new("RGB", (10, 10)).save(input_dir / f"{i:03d}.png")
+        model = MagicMock()
+        model.client.process_image.return_value = "text"
+        errors: list[Exception] = []
+
+        def run() -> None:
+            with Progress(disable=True) as progress:
+                task = progress.add_task("test", total=None)
+                try:
+                    _run_pipeline(
+                        model,
+                        _iter_inputs(input_dir, frozenset({"png"})),
+                        input_dir,
+                        output_dir,
+                        "base",
+                        2,
+                        2,
+                        4,
+                        progress,
+                        task,
+                    )
+                except Exception as e:
+                    errors.append(e)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+        assert not thread.is_alive(), "pipeline hung after a stage failed"
+        return errors
+
+    def test_run_pipeline_write_failure_does_not_hang(self):
+        """Test a failing writer stops upstream stages and its error is raised."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # A file in place of the output directory makes every write fail
+            output_dir = Path(tmpdir) / "output"
+            output_dir.touch()
+
+            errors = self._run_pipeline_in_thread(tmpdir, output_dir)
+
+            assert len(errors) == 1
+            assert isinstance(errors[0], OSError)
+
+    def test_run_pipeline_infer_failure_does_not_hang(self):
+        """Test a failing inference stage drains the rasterizers and its error is raised."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch(
+                "ocr_project.utils.batching.group_by_size",
+                side_effect=RuntimeError("grouping exploded"),
+            ):
+                errors = self._run_pipeline_in_thread(tmpdir, Path(tmpdir) / "output")
+
+            assert [str(e) for e in errors] == ["grouping exploded"]
+
+    def test_iter_inputs_filters_extensions(self):
+        """Test the directory walk recurses and matches extensions case-insensitively."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "a" / "b").mkdir(parents=True)
+            (root / "scan.PNG").touch()
+            (root / "a" / "doc.pdf").touch()
+            (root / "a" / "b" / "notes.txt").touch()
+            (root / "a" / "b" / "photo.jpg").touch()
+
+            found = _iter_inputs(root, frozenset({"png", "jpg", "pdf"}))
+
+            assert sorted(p.name for p in found) == ["doc.pdf", "photo.jpg", "scan.PNG"]
+
+    def test_iter_inputs_ignores_dotless_names(self):
+        """Test files named like an extension, with no dot, are not matched."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "pdf").touch()
+            (root / ".png").touch()
+            (root / "doc.pdf").touch()
+
+            found = _iter_inputs(root, frozenset({"png", "pdf"}))
+
+            assert [p.name for p in found] == ["doc.pdf"]
+
+    def test_iter_inputs_skips_unreadable_directories(self):
+        """Test a directory that cannot be listed is skipped rather than ending the walk."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "locked").mkdir()
+            (root / "scan.png").touch()
+            scandir = os.scandir
+
+            def fake_scandir(path):
+                if Path(path).name == "locked":
+                    raise PermissionError(13, "Permission denied", path)
+                return scandir(path)
+
+            with patch("ocr_project.cli.main.os.scandir", side_effect=fake_scandir):
+                found = list(_iter_inputs(root, frozenset({"png"})))
+
+            assert [p.name for p in found] == ["scan.png"]
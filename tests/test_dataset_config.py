@@ -206,3 +206,24 @@ subsets:
 
         finally:
             temp_path.unlink()
+
+    def test_dict_roundtrip(self):
+        """Test to_dict/from_dict roundtrip, including nested subsets and defaults."""
+        config = DatasetConfig(
+            name="test/dict",
+            subsets=[SubsetConfig(name="s", splits=["train"], content_columns=["content"])],
+            output_dir=Path("./out"),
+        )
+
+        data = config.to_dict()
+        assert data["output_dir"] == "out"
+        assert list(data)[-1] == "subsets"
+        assert DatasetConfig.from_dict(data) == config
+
+        minimal = DatasetConfig.from_dict(
+            {"name": "x", "output_dir": "o", "subsets": [data["subsets"][0]]}
+        )
+        assert minimal.streaming is True
+        assert minimal.overwrite is False
+        assert minimal.batch_size == 16
+        assert minimal.subsets[0].image_columns == []
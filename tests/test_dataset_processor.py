@@ -1,7 +1,10 @@
 """Tests for dataset processor."""
 
+import asyncio
+import io
+import threading
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from PIL import Image
@@ -13,7 +16,7 @@ from ocr_project.dataset.processor import DatasetProcessor
 class TestDatasetProcessor:
     """Tests for DatasetProcessor class."""
 
-    @patch("httpx.get")
+    @patch("httpx.Client.get")
     def test_init_success(self, mock_get):
         """Test DatasetProcessor initialization with running server."""
         mock_response = MagicMock()
@@ -28,7 +31,7 @@ class TestDatasetProcessor:
         assert processor.config == config
         assert processor.resolution == "base"
 
-    @patch("httpx.get")
+    @patch("httpx.Client.get")
     def test_init_server_not_running(self, mock_get):
         """Test DatasetProcessor initialization with server not running."""
         mock_get.side_effect = Exception("Connection refused")
@@ -39,21 +42,13 @@ class TestDatasetProcessor:
         with pytest.raises(RuntimeError, match="vLLM server is not running"):
             DatasetProcessor(config)
 
-    def test_extract_content_from_bytes(self):
+    def test_extract_content_from_bytes(self, tiny_png_bytes):
         """Test extracting image from bytes."""
-        # Create a test image
-        img = Image.new("RGB", (10, 10), color="red")
-        import io
-
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        img_bytes = buffer.getvalue()
-
         subset = SubsetConfig(name="test", splits=["train"], content_columns=["content"])
         config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=Path("./output"))
 
         # Mock health check
-        with patch("httpx.get") as mock_get:
+        with patch("httpx.Client.get") as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_get.return_value = mock_response
@@ -61,10 +56,27 @@ class TestDatasetProcessor:
             processor = DatasetProcessor(config)
 
             # Test extraction
-            result = processor._extract_content_from_bytes(img_bytes, ".png")
+            result = list(processor._extract_content_from_bytes(tiny_png_bytes, ".png"))
 
-            assert result is not None
-            assert isinstance(result, Image.Image)
+            assert len(result) == 1
+            assert result[0][0] == 1
+            assert isinstance(result[0][1], Image.Image)
+
+    def test_extract_content_from_bytes_drafts_jpeg(self):
+        """Test large JPEGs are decoded at reduced scale for the resolution."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (4000, 2000)).save(buffer, format="JPEG")
+
+        subset = SubsetConfig(name="test", splits=["train"], content_columns=["content"])
+        config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=Path("./output"))
+
+        with patch("httpx.Client.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            processor = DatasetProcessor(config, resolution="base")
+
+            result = list(processor._extract_content_from_bytes(buffer.getvalue(), ".jpg"))
+
+        assert result[0][1].size == (2000, 1000)
 
     def test_extract_content_from_bytes_invalid(self):
         """Test extracting from invalid bytes."""
@@ -73,22 +85,22 @@ class TestDatasetProcessor:
         subset = SubsetConfig(name="test", splits=["train"], content_columns=["content"])
         config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=Path("./output"))
 
-        with patch("httpx.get") as mock_get:
+        with patch("httpx.Client.get") as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_get.return_value = mock_response
 
             processor = DatasetProcessor(config)
-            result = processor._extract_content_from_bytes(invalid_bytes, ".png")
+            result = list(processor._extract_content_from_bytes(invalid_bytes, ".png"))
 
-            assert result is None
+            assert result == []
 
     def test_should_process_row_no_filter(self):
         """Test row processing with no filter."""
         subset = SubsetConfig(name="test", splits=["train"], content_columns=["content"])
         config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=Path("./output"))
 
-        with patch("httpx.get") as mock_get:
+        with patch("httpx.Client.get") as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_get.return_value = mock_response
@@ -109,7 +121,7 @@ class TestDatasetProcessor:
         )
         config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=Path("./output"))
 
-        with patch("httpx.get") as mock_get:
+        with patch("httpx.Client.get") as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_get.return_value = mock_response
@@ -127,6 +139,28 @@ class TestDatasetProcessor:
             row3 = {"content": b"data", "file_type": "video"}
             assert processor._should_process_row(row3, subset) is False
 
+    def test_should_process_row_unhashable_values(self):
+        """Test filtering on list-valued cells and nested filter values."""
+        config = DatasetConfig(name="test/dataset", subsets=[], output_dir=Path("./output"))
+        with patch("httpx.Client.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            processor = DatasetProcessor(config)
+
+        subset = SubsetConfig(
+            name="test",
+            splits=["train"],
+            content_columns=["content"],
+            filter_column="tags",
+            filter_values=["image"],
+        )
+        assert processor._should_process_row({"tags": "image"}, subset) is True
+        assert processor._should_process_row({"tags": ["image"]}, subset) is False
+
+        subset.filter_values = [["image", "scan"], "document"]
+        assert processor._should_process_row({"tags": ["image", "scan"]}, subset) is True
+        assert processor._should_process_row({"tags": "document"}, subset) is True
+        assert processor._should_process_row({"tags": ["image"]}, subset) is False
+
     def test_process_row_image_column(self):
         """Test processing row with image column."""
         subset = SubsetConfig(
@@ -137,7 +171,7 @@ class TestDatasetProcessor:
         )
         config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=Path("./output"))
 
-        with patch("httpx.get") as mock_get:
+        with patch("httpx.Client.get") as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_get.return_value = mock_response
@@ -148,36 +182,248 @@ class TestDatasetProcessor:
             img = Image.new("RGB", (10, 10), color="blue")
             row = {"image": img}
 
-            images = processor._process_row(row, subset)
+            images = list(processor._process_row(row, subset))
 
-            assert len(images) == 1
-            assert images[0][0] == "image"
-            assert images[0][1] == img
+            assert images == [("image", 1, img)]
 
-    def test_process_row_bytes_column(self):
+    def test_process_row_bytes_column(self, tiny_png_bytes):
         """Test processing row with bytes column."""
         subset = SubsetConfig(name="test", splits=["train"], content_columns=["content"])
         config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=Path("./output"))
 
-        with patch("httpx.get") as mock_get:
+        with patch("httpx.Client.get") as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_get.return_value = mock_response
 
             processor = DatasetProcessor(config)
 
-            # Create test image bytes
-            img = Image.new("RGB", (10, 10), color="green")
-            import io
+            row = {"content": tiny_png_bytes, "extension": ".png"}
 
-            buffer = io.BytesIO()
-            img.save(buffer, format="PNG")
-            img_bytes = buffer.getvalue()
+            images = list(processor._process_row(row, subset))
 
-            row = {"content": img_bytes, "extension": ".png"}
+            assert len(images) == 1
+            assert images[0][:2] == ("content", 1)
+            assert isinstance(images[0][2], Image.Image)
 
-            images = processor._process_row(row, subset)
+    def test_process_subset_skips_existing_outputs(self, tmp_path):
+        """Test outputs already on disk are skipped and the rest are processed."""
+        subset = SubsetConfig(
+            name="sub", splits=["train"], content_columns=[], image_columns=["image"]
+        )
+        config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=tmp_path)
+        split_dir = tmp_path / "sub" / "train"
+        split_dir.mkdir(parents=True)
+        (split_dir / "done_image.md").write_text("old")
+
+        rows = [
+            {"path": "done", "image": Image.new("RGB", (10, 10))},
+            {"path": "new", "image": Image.new("RGB", (10, 10))},
+        ]
+
+        with patch("httpx.Client.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            processor = DatasetProcessor(config)
+        processor.client = MagicMock()
+        processor.client.aprocess_image = AsyncMock(return_value="# text")
 
-            assert len(images) == 1
-            assert images[0][0] == "content"
-            assert isinstance(images[0][1], Image.Image)
+        with patch("ocr_project.dataset.processor.load_dataset", return_value=rows):
+            results = list(processor.process_subset(subset))
+
+        assert [error for _, _, error in results] == ["skipped (already exists)", None]
+        assert (split_dir / "done_image.md").read_text() == "old"
+        assert (split_dir / "new_image.md").read_text() == "# text"
+
+    def test_process_subset_pipeline_errors(self, tmp_path):
+        """Test row decoding failures are reported and dataset errors propagate."""
+        subset = SubsetConfig(
+            name="sub", splits=["train"], content_columns=[], image_columns=["image"]
+        )
+        config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=tmp_path)
+
+        def rows():
+            yield {"path": "bad", "image": "not decodable"}
+            yield {"path": "good", "image": Image.new("RGB", (10, 10))}
+            raise ConnectionError("stream interrupted")
+
+        with patch("httpx.Client.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            processor = DatasetProcessor(config)
+        processor.client = MagicMock()
+        processor.client.aprocess_image = AsyncMock(return_value="# text")
+        original = processor._process_row
+        processor._process_row = lambda row, subset_config: (
+            original(row, subset_config) if row["path"] == "good" else 1 / 0
+        )
+
+        results = []
+        with (
+            patch("ocr_project.dataset.processor.load_dataset", return_value=rows()),
+            pytest.raises(ConnectionError, match="stream interrupted"),
+        ):
+            results.extend(processor.process_subset(subset))
+
+        assert ("sub/train/bad", "", "division by zero") in results
+        assert ("sub/train/good/image", str(tmp_path / "sub/train/good_image.md"), None) in results
+
+    def test_process_subset_ocr_failure_does_not_hang(self, tmp_path):
+        """Test an OCR stage failure stops the pipeline and is raised."""
+        subset = SubsetConfig(
+            name="sub", splits=["train"], content_columns=[], image_columns=["image"]
+        )
+        config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=tmp_path)
+        # More images than fit in the queues, so the decoders block on a full queue
+        rows = [{"path": f"doc{i}", "image": Image.new("RGB", (10, 10))} for i in range(100)]
+
+        with patch("httpx.Client.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            processor = DatasetProcessor(config)
+        raised = []
+
+        def run():
+            try:
+                list(processor.process_subset(subset))
+            except RuntimeError as e:
+                raised.append(e)
+
+        with (
+            patch("ocr_project.dataset.processor.load_dataset", return_value=rows),
+            patch(
+                "ocr_project.dataset.processor.group_by_size",
+                side_effect=RuntimeError("server exploded"),
+            ),
+        ):
+            thread = threading.Thread(target=run, daemon=True)
+            thread.start()
+            thread.join(timeout=10)
+
+        assert not thread.is_alive()
+        assert [str(e) for e in raised] == ["server exploded"]
+
+    def test_process_subset_shares_one_session(self, tmp_path):
+        """Test all images of a split are sent over one session without batch barriers."""
+        subset = SubsetConfig(
+            name="sub", splits=["train"], content_columns=[], image_columns=["image"]
+        )
+        config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=tmp_path)
+        rows = [{"path": f"doc{i}", "image": Image.new("RGB", (10, 10))} for i in range(5)]
+
+        with patch("httpx.Client.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            processor = DatasetProcessor(config, batch_size=2)
+        release = asyncio.Event()
+        started = []
+
+        async def aprocess_image(image, resolution, session):
+            started.append(session)
+            # Requests from later micro-batches start while earlier ones wait
+            if len(started) == 5:
+                release.set()
+            await asyncio.wait_for(release.wait(), timeout=5)
+            return "# text"
+
+        processor.client = MagicMock()
+        processor.client.aprocess_image = aprocess_image
+
+        with patch("ocr_project.dataset.processor.load_dataset", return_value=rows):
+            results = list(processor.process_subset(subset))
+
+        assert [error for _, _, error in results] == [None] * 5
+        assert processor.client.aio_session.call_count == 1
+        assert len(set(map(id, started))) == 1
+
+    def test_process_all_counts_results(self, tmp_path):
+        """Test process_all tallies successes, skips and errors per subset."""
+        subsets = [
+            SubsetConfig(name=name, splits=["train"], content_columns=["content"])
+            for name in ("first", "second")
+        ]
+        config = DatasetConfig(name="test/dataset", subsets=subsets, output_dir=tmp_path)
+
+        with patch("httpx.Client.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            processor = DatasetProcessor(config)
+
+        results = {
+            "first": [(f"first/train/doc{i}", f"doc{i}.md", None) for i in range(20)]
+            + [("first/train/old", "old.md", "skipped (already exists)")]
+            + [("first/train/[bad]", "", "boom")],
+            "second": [("second/train/doc", "doc.md", None)],
+        }
+        with patch.object(
+            processor,
+            "process_subset",
+            side_effect=lambda subset_config, *shared: iter(results[subset_config.name]),
+        ):
+            stats = processor.process_all()
+
+        assert stats == {
+            "first": {"success": 20, "error": 1, "skipped": 1, "total": 22},
+            "second": {"success": 1, "error": 0, "skipped": 0, "total": 1},
+        }
+        assert list(stats) == ["first", "second"]
+
+    def test_process_all_shares_in_flight_limit(self, tmp_path):
+        """Test concurrent subsets together keep at most _MAX_IN_FLIGHT requests open."""
+        subsets = [
+            SubsetConfig(name=name, splits=["train"], content_columns=[], image_columns=["image"])
+            for name in ("first", "second", "third")
+        ]
+        config = DatasetConfig(name="test/dataset", subsets=subsets, output_dir=tmp_path)
+
+        with patch("httpx.Client.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            processor = DatasetProcessor(config)
+        lock = threading.Lock()
+        open_requests = 0
+        peak = 0
+
+        async def aprocess_image(image, resolution, session):
+            nonlocal open_requests, peak
+            with lock:
+                open_requests += 1
+                peak = max(peak, open_requests)
+            await asyncio.sleep(0.01)
+            with lock:
+                open_requests -= 1
+            return "# text"
+
+        processor.client = MagicMock()
+        processor.client.aprocess_image = aprocess_image
+
+        with (
+            patch("ocr_project.dataset.processor._MAX_IN_FLIGHT", 4),
+            patch(
+                "ocr_project.dataset.processor.load_dataset",
+                side_effect=lambda *args, **kwargs: [
+                    {"path": f"doc{i}", "image": Image.new("RGB", (10, 10))} for i in range(20)
+                ],
+            ),
+        ):
+            stats = processor.process_all()
+
+        assert all(subset_stats["success"] == 20 for subset_stats in stats.values())
+        assert peak == 4
+
+    def test_extract_content_from_bytes_sniffs_pdf(self):
+        """Test PDF bytes are rasterized without an extension or a PIL probe."""
+        subset = SubsetConfig(name="test", splits=["train"], content_columns=["content"])
+        config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=Path("./output"))
+
+        with patch("httpx.Client.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=200)
+            processor = DatasetProcessor(config)
+
+        page = Image.new("RGB", (10, 10))
+        with (
+            patch(
+                "ocr_project.dataset.processor.pdf_bytes_to_images_iter",
+                return_value=iter([(1, page)]),
+            ) as rasterize,
+            patch("ocr_project.dataset.processor.Image.open") as image_open,
+        ):
+            result = list(processor._extract_content_from_bytes(b"%PDF-1.7 ...", None))
+
+        assert result == [(1, page)]
+        rasterize.assert_called_once_with(b"%PDF-1.7 ...")
+        image_open.assert_not_called()
@@ -0,0 +1,91 @@
+"""Tests for dataset export."""
+
+import pyarrow.parquet as pq
+import pytest
+
+from ocr_project.dataset.export import DatasetExporter
+
+
+def _write_subset(root):
+    """Create a subset with a multi-page train document and a test image."""
+    (root / "sub" / "train").mkdir(parents=True)
+    (root / "sub" / "test").mkdir()
+    for page in (1, 2, 3):
+        (root / "sub" / "train" / f"doc_page{page:03d}.md").write_text(f"page {page} text")
+    (root / "sub" / "test" / "scan.md").write_text("# Heading\n\nbody")
+
+
+class TestDatasetExporter:
+    """Tests for DatasetExporter class."""
+
+    def test_iter_files_metadata(self, tmp_path):
+        """Test records carry split, page number and text statistics."""
+        _write_subset(tmp_path)
+        exporter = DatasetExporter(tmp_path, "test/dataset")
+
+        records = sorted(
+            exporter.iter_files(tmp_path / "sub"),
+            key=lambda r: (r["split"], r["page_number"] or 0),
+        )
+
+        assert [(r["split"], r["source_file"], r["page_number"]) for r in records] == [
+            ("test", "scan", None),
+            ("train", "doc", 1),
+            ("train", "doc", 2),
+            ("train", "doc", 3),
+        ]
+        assert records[0]["line_count"] == 3
+        assert records[0]["word_count"] == 3
+
+    def test_export_subset_split(self, tmp_path):
+        """Test exporting one split writes only that split's records."""
+        _write_subset(tmp_path)
+        exporter = DatasetExporter(tmp_path, "test/dataset")
+
+        output_path = exporter.export_subset("sub", "train")
+
+        assert output_path.name == "sub-train.parquet"
+        table = pq.read_table(output_path)
+        assert table.num_rows == 3
+        assert set(table.column("split").to_pylist()) == {"train"}
+
+    def test_export_subset_missing_split(self, tmp_path):
+        """Test exporting a split with no records raises and leaves no file."""
+        _write_subset(tmp_path)
+        exporter = DatasetExporter(tmp_path, "test/dataset")
+
+        with pytest.raises(ValueError, match="No records found"):
+            exporter.export_subset("sub", "validation")
+        assert not (tmp_path / "dataset" / "sub-validation.parquet").exists()
+
+    def test_export_all_shards_by_size(self, tmp_path, monkeypatch):
+        """Test export_all writes one file per small split and shards large ones."""
+        # Small batches so shards can roll over within a small test corpus
+        monkeypatch.setattr("ocr_project.dataset.export._WRITE_BATCH_SIZE", 256)
+        _write_subset(tmp_path)
+        for i in range(3000):
+            (tmp_path / "sub" / "train" / f"extra{i}.md").write_text("x" * 1000)
+        exporter = DatasetExporter(tmp_path, "test/dataset")
+
+        results = exporter.export_all(max_shard_size_mb=1)
+
+        names = sorted(path.name for path in results["sub"])
+        assert "sub-test.parquet" in names
+        train_shards = [name for name in names if name.startswith("sub-train-")]
+        assert len(train_shards) > 1
+        assert train_shards[0] == f"sub-train-00000-of-{len(train_shards):05d}.parquet"
+        rows = sum(pq.read_table(tmp_path / "dataset" / name).num_rows for name in train_shards)
+        assert rows == 3003
+        assert not list((tmp_path / "dataset").glob("*.tmp"))
+
+    def test_create_dataset_card_counts(self, tmp_path):
+        """Test the dataset card reports per-subset record and file counts."""
+        _write_subset(tmp_path)
+        exporter = DatasetExporter(tmp_path, "test/dataset")
+        exporter.export_all()
+
+        card = exporter.create_dataset_card(tmp_path / "dataset" / "README.md")
+
+        assert "- **sub**: 4 records from 4 files" in card
+        assert "path: sub-train.parquet" in card
+        assert (tmp_path / "dataset" / "README.md").read_text() == card
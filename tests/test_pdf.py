@@ -1,11 +1,32 @@
 """Tests for PDF processing utilities."""
 
+import shutil
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
+from PIL import Image
 
-from ocr_project.utils.pdf import is_pdf, pdf_to_images
+from ocr_project.utils.pdf import (
+    get_pdf_files,
+    get_pdf_page_count,
+    is_pdf,
+    pdf_bytes_to_images_iter,
+    pdf_to_images,
+    pdf_to_images_iter,
+)
+
+# Single blank 1x2 inch page, rendered 72x144 at 72 DPI
+_DUMMY_PDF = Path(__file__).parent / "fixtures" / "dummy.pdf"
+
+
+@pytest.fixture(scope="module")
+def invalid_pdf(tmp_path_factory):
+    """A .pdf file that does not hold a PDF, written once per module."""
+    path = tmp_path_factory.mktemp("pdfs") / "bad.pdf"
+    path.write_bytes(b"not a valid pdf")
+    return path
 
 
 class TestPDFUtils:
@@ -23,24 +44,112 @@ class TestPDFUtils:
         assert not is_pdf(Path("document.txt"))
         assert not is_pdf(Path("file"))
 
+    def test_get_pdf_files(self, tmp_path):
+        """Test get_pdf_files lists PDFs by extension and skips directories."""
+        (tmp_path / "a.pdf").write_bytes(b"%PDF")
+        (tmp_path / "B.PDF").write_bytes(b"%PDF")
+        (tmp_path / "c.png").write_bytes(b"")
+        (tmp_path / "d.pdf").mkdir()
+
+        assert sorted(p.name for p in get_pdf_files(tmp_path)) == ["B.PDF", "a.pdf"]
+
     def test_pdf_to_images_nonexistent(self):
         """Test pdf_to_images raises FileNotFoundError for nonexistent PDF."""
         with pytest.raises(FileNotFoundError):
             pdf_to_images(Path("/nonexistent/file.pdf"))
 
-    def test_pdf_to_images_invalid(self):
+    def test_pdf_to_images_invalid(self, invalid_pdf):
         """Test pdf_to_images raises ValueError for invalid PDF."""
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
-            f.write(b"not a valid pdf")
-            f.flush()
-            temp_path = Path(f.name)
-
-        try:
-            with pytest.raises(ValueError, match="Failed to convert PDF"):
-                pdf_to_images(temp_path)
-        finally:
-            temp_path.unlink()
-
-    # Note: Testing actual PDF conversion would require a real PDF file
-    # or mocking pdf2image.convert_from_path. For now, we test error cases.
-    # In a production environment, you'd add a test PDF file to a fixtures folder.
+        with pytest.raises(ValueError, match="Failed to convert PDF"):
+            pdf_to_images(invalid_pdf)
+
+    def test_pdf_bytes_to_images_iter_invalid(self, tmp_path, monkeypatch):
+        """Test pdf_bytes_to_images_iter raises ValueError and removes its temp file."""
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+        with pytest.raises(ValueError, match="Failed to convert PDF"):
+            list(pdf_bytes_to_images_iter(b"not a valid pdf"))
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_pdf_to_images_iter_nonexistent(self):
+        """Test pdf_to_images_iter raises FileNotFoundError before iteration."""
+        with pytest.raises(FileNotFoundError):
+            pdf_to_images_iter(Path("/nonexistent/file.pdf"))
+
+    @patch("ocr_project.utils.pdf.pdfinfo_from_path")
+    def test_get_pdf_page_count_cached_per_file_version(self, mock_pdfinfo, tmp_path):
+        """Test page counts are reused until the file changes."""
+        mock_pdfinfo.return_value = {"Pages": 3}
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(b"%PDF-1.7")
+
+        assert get_pdf_page_count(path) == 3
+        assert get_pdf_page_count(path) == 3
+        assert mock_pdfinfo.call_count == 1
+
+        path.write_bytes(b"%PDF-1.7 changed")
+        mock_pdfinfo.return_value = {"Pages": 4}
+        assert get_pdf_page_count(path) == 4
+
+    def test_get_pdf_page_count_nonexistent(self):
+        """Test get_pdf_page_count raises FileNotFoundError for a missing PDF."""
+        with pytest.raises(FileNotFoundError):
+            get_pdf_page_count(Path("/nonexistent/file.pdf"))
+
+    @patch("ocr_project.utils.pdf.convert_from_path")
+    @patch("ocr_project.utils.pdf.pdfinfo_from_path")
+    def test_pdf_to_images_iter_renders_in_batches(self, mock_pdfinfo, mock_convert):
+        """Test pdf_to_images_iter rasterizes page windows lazily."""
+        mock_pdfinfo.return_value = {"Pages": 5}
+        mock_convert.side_effect = lambda path, dpi, first_page, last_page: [
+            Image.new("RGB", (10, 10)) for _ in range(first_page, last_page + 1)
+        ]
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+            pages = pdf_to_images_iter(Path(f.name), pages_per_batch=2)
+            assert mock_convert.call_count == 0
+
+            page_nums = [page_num for page_num, _ in pages]
+
+        assert page_nums == [1, 2, 3, 4, 5]
+        windows = [
+            (c.kwargs["first_page"], c.kwargs["last_page"]) for c in mock_convert.call_args_list
+        ]
+        assert windows == [(1, 2), (3, 4), (5, 5)]
+
+    def test_unknown_backend(self):
+        """Test an unknown PDF backend is rejected."""
+        with pytest.raises(ValueError, match="Unknown PDF backend"):
+            list(pdf_bytes_to_images_iter(b"%PDF-1.7", backend="ghostscript"))
+
+    def test_pdfium_backend_renders_in_process(self, tmp_path):
+        """Test the pdfium backend renders pages from bytes and from a path, lazily or not."""
+        pytest.importorskip("pypdfium2")
+        path = tmp_path / "doc.pdf"
+        pages = [Image.new("RGB", (72, 144)), Image.new("RGB", (144, 72))]
+        pages[0].save(path, save_all=True, append_images=pages[1:], resolution=72)
+
+        results = [
+            list(pdf_bytes_to_images_iter(path.read_bytes(), dpi=144, backend="pdfium")),
+            list(pdf_to_images_iter(path, dpi=144, backend="pdfium")),
+            pdf_to_images(path, dpi=144, backend="pdfium"),
+        ]
+
+        for result in results:
+            assert [(page_num, img.size) for page_num, img in result] == [
+                (1, (144, 288)),
+                (2, (288, 144)),
+            ]
+
+        with pytest.raises(ValueError, match="Failed to convert PDF"):
+            list(pdf_bytes_to_images_iter(b"not a valid pdf", backend="pdfium"))
+
+    @pytest.mark.skipif(shutil.which("pdftoppm") is None, reason="poppler is not installed")
+    def test_pdf_to_images_fixture(self):
+        """Test a real single-page PDF is rendered by poppler at the requested DPI."""
+        pages = pdf_to_images(_DUMMY_PDF, dpi=144)
+
+        assert [(page_num, img.size) for page_num, img in pages] == [(1, (144, 288))]
+        streamed = list(pdf_bytes_to_images_iter(_DUMMY_PDF.read_bytes(), dpi=72))
+        assert [(page_num, img.size) for page_num, img in streamed] == [(1, (72, 144))]
@@ -0,0 +1,46 @@
+"""Tests for dataset presharding."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pyarrow.parquet as pq
+from datasets import Dataset
+
+from ocr_project.dataset.config import DatasetConfig, SubsetConfig
+from ocr_project.dataset.preshard import find_shards, preshard_split
+
+
+class TestPreshard:
+    """Tests for preshard_split."""
+
+    def _config(self, output_dir: Path) -> tuple[DatasetConfig, SubsetConfig]:
+        subset = SubsetConfig(name="sub", splits=["train"], content_columns=["content"])
+        config = DatasetConfig(name="test/dataset", subsets=[subset], output_dir=output_dir)
+        return config, subset
+
+    def test_preshard_split_rolls_over_shards(self, tmp_path):
+        """Test rows are split across shards at the target size and all kept."""
+        config, subset = self._config(tmp_path)
+        source = Dataset.from_dict(
+            {"path": [f"doc{i}" for i in range(1000)], "content": [b"x" * 1000] * 1000}
+        ).to_iterable_dataset()
+
+        with patch("ocr_project.dataset.preshard.load_dataset", return_value=source):
+            shards = preshard_split(config, subset, "train", target_bytes=100_000)
+
+        assert len(shards) > 1
+        assert shards == find_shards(config, "sub", "train")
+        paths = [p for shard in shards for p in pq.read_table(shard).column("path").to_pylist()]
+        assert paths == [f"doc{i}" for i in range(1000)]
+
+    def test_preshard_split_skips_existing(self, tmp_path):
+        """Test an already presharded split is not re-read."""
+        config, subset = self._config(tmp_path)
+        source = Dataset.from_dict({"content": [b"x"]}).to_iterable_dataset()
+
+        with patch("ocr_project.dataset.preshard.load_dataset", return_value=source) as mock_load:
+            first = preshard_split(config, subset, "train")
+            second = preshard_split(config, subset, "train")
+
+        assert first == second
+        assert mock_load.call_count == 1
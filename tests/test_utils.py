@@ -4,9 +4,23 @@ import tempfile
 from pathlib import Path
 
 import pytest
+from PIL import Image
 
 from ocr_project.utils.file_io import read_markdown, save_markdown
-from ocr_project.utils.image import get_image_files, load_image
+from ocr_project.utils.image import (
+    get_image_files,
+    load_image,
+    load_images_parallel,
+    open_image,
+)
+
+
+@pytest.fixture(scope="module")
+def invalid_image(tmp_path_factory):
+    """A .png file that does not hold an image, written once per module."""
+    path = tmp_path_factory.mktemp("images") / "bad.png"
+    path.write_bytes(b"not an image")
+    return path
 
 
 class TestImageUtils:
@@ -17,18 +31,49 @@ class TestImageUtils:
         with pytest.raises(FileNotFoundError):
             load_image(Path("/nonexistent/image.png"))
 
-    def test_load_image_invalid(self):
+    def test_load_image_invalid(self, invalid_image):
         """Test loading an invalid image raises ValueError."""
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            f.write(b"not an image")
-            f.flush()
-            temp_path = Path(f.name)
-
-        try:
-            with pytest.raises(ValueError):
-                load_image(temp_path)
-        finally:
-            temp_path.unlink()
+        with pytest.raises(ValueError):
+            load_image(invalid_image)
+
+    def test_load_image_max_size_reduces_jpeg_decode(self, tmp_path):
+        """Test JPEGs are decoded at the smallest scale covering max_size."""
+        path = tmp_path / "page.jpg"
+        Image.new("RGB", (3000, 2000)).save(path)
+
+        assert load_image(path).size == (3000, 2000)
+        assert load_image(path, max_size=1024).size == (1500, 1000)
+        assert load_image(path, max_size=4096).size == (3000, 2000)
+
+    def test_open_image_defers_decode(self, tmp_path):
+        """Test open_image reads the header without decoding pixels."""
+        path = tmp_path / "page.png"
+        Image.new("RGB", (30, 20)).save(path)
+
+        img = open_image(path)
+
+        assert img.size == (30, 20)
+        assert img.format == "PNG"
+        assert img.tile  # pixel data still pending decode
+        img.load()
+        assert not img.tile
+
+    def test_open_image_invalid(self, invalid_image):
+        """Test open_image rejects files that are not images."""
+        with pytest.raises(ValueError):
+            open_image(invalid_image)
+
+    def test_load_images_parallel_keeps_order(self, tmp_path):
+        """Test images loaded in parallel come back in input order."""
+        paths = []
+        for width in range(10, 20):
+            path = tmp_path / f"img{width}.png"
+            Image.new("RGB", (width, 10)).save(path)
+            paths.append(path)
+
+        images = load_images_parallel(paths, max_workers=4)
+
+        assert [img.width for img in images] == list(range(10, 20))
 
     def test_get_image_files_empty_dir(self):
         """Test getting image files from empty directory."""
@@ -1,11 +1,93 @@
 """Tests for vLLM API client."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import base64
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
 
+import httpx
 import pytest
 from PIL import Image
 
-from ocr_project.models.vllm_client import ServerNotAvailableError, VLLMClient
+from ocr_project.models.vllm_client import (
+    APIError,
+    RateLimiter,
+    ServerNotAvailableError,
+    VLLMClient,
+    _resize_for_resolution,
+)
+
+
+class _OCRHandler(BaseHTTPRequestHandler):
+    """Fake chat completions endpoint answering with each image's width.
+
+    Images 13 pixels wide are rejected with a server error.
+    """
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        url = body["messages"][0]["content"][1]["image_url"]["url"]
+        width = Image.open(io.BytesIO(base64.b64decode(url.split(",", 1)[1]))).width
+        if width == 13:
+            self.send_error(500)
+            return
+
+        data = json.dumps({"choices": [{"message": {"content": str(width)}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _SlowOCRHandler(_OCRHandler):
+    """Fake endpoint that holds each request briefly and records peak concurrency."""
+
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def do_POST(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            time.sleep(0.05)
+            super().do_POST()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+def _mock_client(handler, **kwargs) -> VLLMClient:
+    """Create a client whose sync requests are answered by handler in-process."""
+    client = VLLMClient(**kwargs)
+    client.http_client.close()
+    client.http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.fixture
+def ocr_server(request):
+    """Run the fake endpoint on a local port and yield its base URL.
+
+    Tests may pass a handler class through indirect parametrization.
+    """
+    handler = getattr(request, "param", _OCRHandler)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+    server.server_close()
 
 
 class TestVLLMClient:
@@ -20,27 +102,74 @@ class TestVLLMClient:
 
     def test_init_custom_params(self):
         """Test VLLMClient with custom parameters."""
-        client = VLLMClient(base_url="http://localhost:9000/v1", timeout=600, max_retries=5)
-        assert client.base_url == "http://localhost:9000/v1"
+        client = VLLMClient(base_url="http://localhost:9000/v1/", timeout=600, max_retries=5)
+        assert client.base_url == "http://localhost:9000/v1/"
+        assert client.health_url == "http://localhost:9000/health"
+        assert client.completions_url == "http://localhost:9000/v1/chat/completions"
         assert client.timeout == 600
         assert client.max_retries == 5
 
-    @patch("httpx.get")
-    def test_health_check_success(self, mock_get):
+    def test_health_check_success(self):
         """Test health check when server is running."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200)
+
+        client = _mock_client(handler)
+        assert client.health_check() is True
+        assert str(requests[0].url) == "http://127.0.0.1:8000/health"
+
+    def test_health_check_caches_healthy_result(self):
+        """Test a healthy result is reused while failures are rechecked."""
+        status = 503
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(status)
+
+        client = _mock_client(handler)
+
+        assert client.health_check() is False
+        status = 200
+        assert client.health_check() is True
+        assert client.health_check() is True
+        assert len(requests) == 2
+
+        assert client.health_check(force=True) is True
+        assert len(requests) == 3
+
+    def test_health_check_cache_shared_until_connection_error(self):
+        """Test new clients reuse a healthy result until the server is unreachable."""
+        health_requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.method == "GET":
+                health_requests.append(request)
+                return httpx.Response(200)
+            raise httpx.ConnectError("Connection refused", request=request)
+
+        assert _mock_client(handler).health_check() is True
+
+        client = _mock_client(handler, max_retries=1)
+        assert client.health_check() is True
+        assert len(health_requests) == 1
+
+        with pytest.raises(ServerNotAvailableError):
+            client.process_image(Image.new("RGB", (10, 10)))
 
-        client = VLLMClient()
         assert client.health_check() is True
+        assert len(health_requests) == 2
 
-    @patch("httpx.get")
-    def test_health_check_failure(self, mock_get):
+    def test_health_check_failure(self):
         """Test health check when server is not running."""
-        mock_get.side_effect = Exception("Connection refused")
 
-        client = VLLMClient()
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("Connection refused", request=request)
+
+        client = _mock_client(handler)
         assert client.health_check() is False
 
     def test_image_to_base64(self):
@@ -55,66 +184,148 @@ class TestVLLMClient:
         assert result.startswith("data:image/png;base64,")
         assert len(result) > 50  # Should contain base64 data
 
-    @patch("httpx.get")
-    def test_process_image_server_not_available(self, mock_get):
-        """Test process_image raises error when server is not available."""
-        mock_get.side_effect = Exception("Connection refused")
+    def test_image_to_base64_jpeg_converts_alpha(self):
+        """Test JPEG encoding flattens RGBA images and uses a JPEG data URI."""
+        img = Image.new("RGBA", (10, 10), color=(255, 0, 0, 128))
 
         client = VLLMClient()
+        result = client.image_to_base64(img, "JPEG")
+
+        assert result.startswith("data:image/jpeg;base64,")
+
+    def test_resize_for_resolution(self):
+        """Test pages are downsampled to the resolution mode's input size."""
+        img = Image.new("RGB", (2000, 1000))
+
+        assert _resize_for_resolution(img, "base").size == (1024, 512)
+        assert _resize_for_resolution(img, "tiny").size == (512, 256)
+        assert _resize_for_resolution(img, "gundam") is img
+
+        small = Image.new("RGB", (300, 400))
+        assert _resize_for_resolution(small, "base") is small
+
+    def test_image_format_from_env(self, monkeypatch):
+        """Test upload format defaults to JPEG and honours OCR_ENCODE."""
+        monkeypatch.delenv("OCR_ENCODE", raising=False)
+        assert VLLMClient().image_format == "JPEG"
+
+        monkeypatch.setenv("OCR_ENCODE", "png")
+        assert VLLMClient().image_format == "PNG"
+
+    def test_image_to_base64_webp(self):
+        """Test WebP uploads use a WebP data URI that decodes back to the image."""
+        img = Image.new("RGB", (10, 10), color="red")
+
+        result = VLLMClient().image_to_base64(img, "WEBP")
+
+        assert result.startswith("data:image/webp;base64,")
+        decoded = Image.open(io.BytesIO(base64.b64decode(result.split(",", 1)[1])))
+        assert decoded.format == "WEBP"
+        assert decoded.size == (10, 10)
+
+    def test_process_image_server_not_available(self):
+        """Test process_image raises error when server is not available."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("Connection refused", request=request)
+
+        client = _mock_client(handler, max_retries=1)
         img = Image.new("RGB", (10, 10), color="red")
 
         with pytest.raises(ServerNotAvailableError):
             client.process_image(img)
 
-    @patch("httpx.get")
-    @patch("ocr_project.models.vllm_client.OpenAI")
-    def test_process_image_success(self, mock_openai_class, mock_get):
-        """Test successful image processing."""
-        # Mock health check
-        mock_health_response = MagicMock()
-        mock_health_response.status_code = 200
-        mock_get.return_value = mock_health_response
+    def test_process_image_server_error(self):
+        """Test server error responses are reported as API errors."""
+        client = _mock_client(lambda request: httpx.Response(500), max_retries=1)
 
-        # Mock OpenAI client response
-        mock_client = MagicMock()
-        mock_openai_class.return_value = mock_client
+        with pytest.raises(APIError):
+            client.process_image(Image.new("RGB", (10, 10)))
 
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = "# Test Output\n\nOCR result"
-        mock_client.chat.completions.create.return_value = mock_response
+    @patch("time.sleep")
+    def test_process_image_retries_transient_errors_only(self, mock_sleep):
+        """Test overload responses are retried while bad requests fail at once."""
+        statuses = [503, 429, 200]
+        calls = []
 
-        client = VLLMClient()
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            status = statuses.pop(0)
+            if status != 200:
+                return httpx.Response(status)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+        client = _mock_client(handler)
+        assert client.process_image(Image.new("RGB", (10, 10))) == "ok"
+        assert len(calls) == 3
+        assert mock_sleep.call_count == 2
+
+        calls.clear()
+        statuses[:] = [400, 200]
+        with pytest.raises(APIError, match="after 1 attempt"):
+            client.process_image(Image.new("RGB", (10, 10)))
+        assert len(calls) == 1
+
+    def test_rate_limiter_spaces_requests(self):
+        """Test the rate limiter reserves evenly spaced slots."""
+        limiter = RateLimiter(target_rps=10)
+
+        delays = [limiter._reserve() for _ in range(3)]
+
+        assert delays[0] == 0
+        assert delays[1] == pytest.approx(0.1, abs=0.01)
+        assert delays[2] == pytest.approx(0.2, abs=0.01)
+
+    def test_process_image_success(self):
+        """Test successful image processing."""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(
+                200, json={"choices": [{"message": {"content": "# Test Output\n\nOCR result"}}]}
+            )
+
+        client = _mock_client(handler)
         img = Image.new("RGB", (10, 10), color="red")
         result = client.process_image(img)
 
         assert result == "# Test Output\n\nOCR result"
+        assert str(requests[0].url) == "http://127.0.0.1:8000/v1/chat/completions"
+        payload = json.loads(requests[0].content)
+        assert payload["model"] == "deepseek-ai/DeepSeek-OCR"
+        assert payload["messages"][0]["content"][1]["image_url"]["url"].startswith("data:image/")
+
+    @pytest.mark.parametrize("batch_size", [1, 2, 8])
+    def test_process_batch(self, ocr_server, batch_size):
+        """Test batch processing returns one result per image, in order."""
+        client = VLLMClient(base_url=ocr_server)
+        # Widths identify the images in the fake server's replies
+        images = [Image.new("RGB", (20 + i, 10)) for i in range(batch_size)]
 
-    @patch("httpx.get")
-    @patch("ocr_project.models.vllm_client.OpenAI")
-    def test_process_batch(self, mock_openai_class, mock_get):
-        """Test batch processing of images."""
-        # Mock health check
-        mock_health_response = MagicMock()
-        mock_health_response.status_code = 200
-        mock_get.return_value = mock_health_response
+        results = client.process_batch(images)
 
-        # Mock OpenAI client
-        mock_client = MagicMock()
-        mock_openai_class.return_value = mock_client
+        assert results == [str(20 + i) for i in range(batch_size)]
 
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = "OCR result"
-        mock_client.chat.completions.create.return_value = mock_response
+    @pytest.mark.parametrize("ocr_server", [_SlowOCRHandler], indirect=True)
+    def test_process_batch_overlaps_requests(self, ocr_server):
+        """Test batch requests are in flight concurrently, up to the limit."""
+        _SlowOCRHandler.peak = 0
+        client = VLLMClient(base_url=ocr_server)
+        images = [Image.new("RGB", (20 + i, 10)) for i in range(8)]
 
-        client = VLLMClient()
-        images = [
-            Image.new("RGB", (10, 10), color="red"),
-            Image.new("RGB", (10, 10), color="blue"),
-        ]
+        results = asyncio.run(client.aprocess_batch(images, max_concurrency=4))
+
+        assert results == [str(20 + i) for i in range(8)]
+        assert 1 < _SlowOCRHandler.peak <= 4
+
+    def test_process_batch_reports_errors_in_order(self, ocr_server):
+        """Test failed images are reported in place without failing the batch."""
+        client = VLLMClient(base_url=ocr_server, max_retries=1)
+        images = [Image.new("RGB", (width, 10)) for width in (11, 12, 13, 14)]
 
         results = client.process_batch(images)
 
-        assert len(results) == 2
-        assert all(r == "OCR result" for r in results)
+        assert results[:2] == ["11", "12"]
+        assert results[2].startswith("Error processing image:")
+        assert results[3] == "14"